@@ -14,3 +14,8 @@ from django.core.asgi import get_asgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'task_management.settings')
 
 application = get_asgi_application()
+
+# The task event stream is served next to Django (needs the apps loaded)
+from tasks.event_stream import TaskEventStream  # noqa: E402
+
+application = TaskEventStream(application)
@@ -14,6 +14,8 @@ from pathlib import Path
 
 import dj_database_url
 import os
+import tempfile
+from importlib.util import find_spec
 import django_heroku
 
 # other imports...
@@ -51,6 +53,13 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    # Per-route request metrics, scraped from /api/metrics/
+    'tasks.metrics.MetricsMiddleware',
+    # Server-Timing header and slow-request log; inside MetricsMiddleware so
+    # that one can read request.timing, and before the rest so it times them
+    'tasks.timing.RequestTimingMiddleware',
+    # Sends GET reads to a replica; before anything that reads the database
+    'tasks.routers.ReplicaRoutingMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -81,16 +90,103 @@ TEMPLATES = [
 
 WSGI_APPLICATION = 'task_management.wsgi.application'
 
+# Serve the native async task endpoints under /api/async/ (task_management.asgi)
+ASYNC_TASK_API = os.environ.get('ASYNC_TASK_API', 'true').lower() in ('1', 'true', 'yes')
+
+# Task change events for the SSE stream at /api/async/tasks/events/ (ASGI
+# only). LocalBroker reaches streams in the same process; use a shared
+# broker backend when writes and streams run in different processes.
+TASK_EVENTS_BACKEND = os.environ.get('TASK_EVENTS_BACKEND', 'tasks.events.LocalBroker')
+TASK_EVENTS_OPTIONS = {'queue_size': int(os.environ.get('TASK_EVENTS_QUEUE_SIZE', 100))}
+TASK_EVENTS_HEARTBEAT = int(os.environ.get('TASK_EVENTS_HEARTBEAT', 15))  # Seconds between keep-alive comments
+
 
 # Database
 # https://docs.djangoproject.com/en/5.1/ref/settings/#databases
 
+def env_flag(name, default='false'):
+    return os.environ.get(name, default).lower() in ('1', 'true', 'yes')
+
+# Connection reuse. With PostgreSQL, psycopg 3 and psycopg_pool installed,
+# each worker process keeps a pool of DATABASE_POOL_* connections that are
+# checked before they are handed out. Otherwise a new connection is opened
+# per request, unless DATABASE_CONN_MAX_AGE makes it persist that many
+# seconds (health-checked before reuse). Django advises against persistent
+# connections under ASGI, which serves the async views and the event
+# stream, so only raise it for WSGI-only deployments.
+DATABASE_POOL = env_flag('DATABASE_POOL', 'true')
+DATABASE_CONN_MAX_AGE = int(os.environ.get('DATABASE_CONN_MAX_AGE', 0))
+DATABASE_POOL_OPTIONS = {
+    'min_size': int(os.environ.get('DATABASE_POOL_MIN_SIZE', 2)),
+    'max_size': int(os.environ.get('DATABASE_POOL_MAX_SIZE', 10)),
+    'timeout': float(os.environ.get('DATABASE_POOL_TIMEOUT', 10)),  # Seconds to wait for a free connection
+    'max_lifetime': float(os.environ.get('DATABASE_POOL_MAX_LIFETIME', 1800)),
+    'max_idle': float(os.environ.get('DATABASE_POOL_MAX_IDLE', 300)),
+}
+DATABASE_SSL_REQUIRE = env_flag('DATABASE_SSL_REQUIRE', 'true' if 'DYNO' in os.environ else 'false')
+
+def database_config(url):
+    config = dj_database_url.parse(
+        url, conn_max_age=DATABASE_CONN_MAX_AGE, conn_health_checks=DATABASE_CONN_MAX_AGE > 0,
+    )
+    if config['ENGINE'] != 'django.db.backends.postgresql':
+        return config
+
+    options = config.setdefault('OPTIONS', {})
+    if DATABASE_SSL_REQUIRE:
+        options['sslmode'] = 'require'
+    if DATABASE_POOL and find_spec('psycopg_pool'):
+        # Pooled connections are returned to the pool after each request.
+        # CONN_HEALTH_CHECKS makes Django pass ConnectionPool.check_connection
+        # as the pool's check.
+        config['CONN_MAX_AGE'] = 0
+        config['CONN_HEALTH_CHECKS'] = True
+        options['pool'] = dict(DATABASE_POOL_OPTIONS)
+    return config
+
+# The primary comes from DATABASE_URL (the local SQLite file by default).
+# Read replicas come from DATABASE_REPLICA_URLS, a comma-separated list of
+# URLs; GET traffic on the task and user endpoints is spread over them by
+# tasks.routers. Two SQLite files stand in locally, e.g.
+#   cp db.sqlite3 replica.sqlite3
+#   DATABASE_REPLICA_URLS=sqlite:///replica.sqlite3 python manage.py runserver
 DATABASES = {
+    'default': database_config(os.environ.get('DATABASE_URL', f"sqlite:///{BASE_DIR / 'db.sqlite3'}")),
+}
+
+REPLICA_DATABASES = []
+for index, url in enumerate(u.strip() for u in os.environ.get('DATABASE_REPLICA_URLS', '').split(',') if u.strip()):
+    alias = f'replica{index + 1}'
+    DATABASES[alias] = database_config(url)
+    # Tests run every alias against the test primary
+    DATABASES[alias]['TEST'] = {'MIRROR': 'default'}
+    REPLICA_DATABASES.append(alias)
+
+DATABASE_ROUTERS = ['tasks.routers.ReplicaRouter']
+
+# Seconds a user's reads stay on the primary after they write
+READ_YOUR_WRITES_SECONDS = int(os.environ.get('READ_YOUR_WRITES_SECONDS', 5))
+
+# Caches
+# Serialized task list pages are cached per process with LRU eviction and a
+# TTL. CULL_FREQUENCY == MAX_ENTRIES evicts one least-recently-used entry
+# at a time once the cache is full.
+
+TASK_PAGE_CACHE_ENTRIES = int(os.environ.get('TASK_PAGE_CACHE_ENTRIES', 2000))
+
+CACHES = {
     'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
-         'default': dj_database_url.config(default='postgres://localhost')
-    }
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    'task_pages': {
+        'BACKEND': 'tasks.cache.CountingLocMemCache',
+        'LOCATION': 'task-pages',
+        'TIMEOUT': int(os.environ.get('TASK_PAGE_CACHE_TIMEOUT', 300)),
+        'OPTIONS': {
+            'MAX_ENTRIES': TASK_PAGE_CACHE_ENTRIES,
+            'CULL_FREQUENCY': TASK_PAGE_CACHE_ENTRIES,
+        },
+    },
 }
 
 AUTHENTICATION_BACKENDS = (
@@ -101,18 +197,49 @@ AUTHENTICATION_BACKENDS = (
 # JWT Authentication Settings
 REST_FRAMEWORK = {
   'DEFAULT_AUTHENTICATION_CLASSES': [
-   'rest_framework.authentication.TokenAuthentication',
+   # Token/JWT authentication with a short-lived cache of the resolved user
+   'tasks.authentication.CachedTokenAuthentication',
    'rest_framework.authentication.SessionAuthentication',
-   'rest_framework_simplejwt.authentication.JWTAuthentication',
+   'tasks.authentication.CachedJWTAuthentication',
   
   ],
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticated',
-    ]
+    ],
+    # Keyset pagination for list endpoints; clients may ask for up to
+    # KeysetPagination.max_page_size rows with ?page_size=
+    'DEFAULT_PAGINATION_CLASS': 'tasks.pagination.KeysetPagination',
+    'PAGE_SIZE': 50,
 }
 
 AUTH_USER_MODEL = 'tasks.User'
 
+# Seconds an authenticated user may be served from the cache
+AUTH_USER_CACHE_TIMEOUT = int(os.environ.get('AUTH_USER_CACHE_TIMEOUT', 30))
+
+# Completed tasks older than this move to TaskArchive (manage.py archive_tasks)
+TASK_ARCHIVE_AFTER_DAYS = int(os.environ.get('TASK_ARCHIVE_AFTER_DAYS', 90))
+
+# Delete tombstones are kept this long for delta sync (manage.py prune_tombstones);
+# clients that last synced before that must sync again from scratch
+TASK_TOMBSTONE_DAYS = int(os.environ.get('TASK_TOMBSTONE_DAYS', 30))
+
+# Requests slower than this, running this many queries, or repeating one
+# statement more than DUPLICATE_QUERY_LIMIT times (N+1) are logged to
+# "tasks.slow_requests"
+SLOW_REQUEST_MS = int(os.environ.get('SLOW_REQUEST_MS', 500))
+SLOW_REQUEST_QUERIES = int(os.environ.get('SLOW_REQUEST_QUERIES', 50))
+DUPLICATE_QUERY_LIMIT = int(os.environ.get('DUPLICATE_QUERY_LIMIT', 5))
+
+# Directory of the per-process metrics files; shared by all workers of one
+# service and cleared on deploy. /api/metrics/ is open to staff users and
+# to scrapers sending "Authorization: Bearer <METRICS_TOKEN>".
+METRICS_DIR = os.environ.get('METRICS_DIR', os.path.join(tempfile.gettempdir(), 'task_management_metrics'))
+METRICS_TOKEN = os.environ.get('METRICS_TOKEN', '')
+
+# Processes hashing passwords for bulk user provisioning; defaults to the CPU count
+PASSWORD_HASH_WORKERS = int(os.environ.get('PASSWORD_HASH_WORKERS', 0)) or None
+
 # Password validation
 # https://docs.djangoproject.com/en/5.1/ref/settings/#auth-password-validators
 
@@ -158,4 +285,5 @@ STATICFILES_STORAGE = 'whitenoise.storage.CompressedManifestStaticFilesStorage'
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 
-django_heroku.settings(locals())
+# DATABASES is configured above (django_heroku would replace the primary)
+django_heroku.settings(locals(), databases=False)
@@ -14,10 +14,13 @@ Including another URLconf
     1. Import the include() function: from django.urls import include, path
     2. Add a URL to urlpatterns:  path('blog/', include('blog.urls'))
 """
+from django.conf import settings
 from django.contrib import admin
 from django.urls import path, include
 
 urlpatterns = [
     path('admin/', admin.site.urls),
+    # Native async task endpoints; best served by the ASGI application
+    *([path('api/async/', include('tasks.async_urls'))] if settings.ASYNC_TASK_API else []),
      path('api/', include('tasks.urls')),
 ]
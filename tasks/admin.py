@@ -1,5 +1,37 @@
+from copy import copy
+
 from django.contrib import admin
 from .models import Task
+from .changes import record_task_changes
 # Register your models here.
 
-admin.site.register(Task)
\ No newline at end of file
+# Admin edits go through the same bookkeeping as the API write paths
+@admin.register(Task)
+class TaskAdmin(admin.ModelAdmin):
+    def save_model(self, request, obj, form, change):
+        old = Task.objects.filter(pk=obj.pk).first() if change else None
+        super().save_model(request, obj, form, change)
+        if old is not None and old.user_id == obj.user_id:
+            if obj.user_id:  # Unowned tasks have no bookkeeping
+                record_task_changes(obj.user_id, before=[old], after=[obj])
+            return
+        # The task moved between users
+        if old is not None and old.user_id:
+            record_task_changes(old.user_id, before=[old])
+        if obj.user_id:
+            record_task_changes(obj.user_id, after=[obj])
+
+    def delete_model(self, request, obj):
+        deleted = copy(obj)  # delete() clears the instance's pk
+        super().delete_model(request, obj)
+        if deleted.user_id:
+            record_task_changes(deleted.user_id, before=[deleted])
+
+    def delete_queryset(self, request, queryset):
+        tasks = list(queryset.exclude(user=None))
+        super().delete_queryset(request, queryset)
+        by_user = {}
+        for task in tasks:
+            by_user.setdefault(task.user_id, []).append(task)
+        for user_id, removed in by_user.items():
+            record_task_changes(user_id, before=removed)
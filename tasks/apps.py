@@ -4,3 +4,9 @@ from django.apps import AppConfig
 class TasksConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'tasks'
+
+    def ready(self):
+        from django.db.backends.signals import connection_created
+        from .timing import install_query_recorder
+
+        connection_created.connect(install_query_recorder, dispatch_uid='tasks.timing')
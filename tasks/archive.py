@@ -0,0 +1,67 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.utils import timezone
+
+from .changes import record_task_changes
+from .models import Task, TaskArchive
+
+# Archival of completed tasks into TaskArchive.
+#
+# Candidates are completed tasks whose completed_at is older than the
+# cutoff, found through the partial task_completed_at_idx index. Each batch
+# copies its rows and deletes them from Task in one short transaction, so
+# no lock is held longer than one batch, and a run can stop anywhere:
+# the next one continues with whatever is left. Archived tasks leave the
+# owner's counters and bump their change stamp like any other delete.
+
+ARCHIVED_FIELDS = ('id', 'title', 'description', 'due_date', 'priority', 'status', 'user_id', 'completed_at')
+
+
+def get_archive_cutoff(days=None):
+    if days is None:
+        days = settings.TASK_ARCHIVE_AFTER_DAYS
+    return timezone.now() - timedelta(days=days)
+
+
+def archivable_tasks(cutoff):
+    return Task.objects.filter(status=Task.STATUS_COMPLETED, completed_at__lt=cutoff)
+
+
+# Archive up to `batch_size` candidates with an id above `after_id`.
+# Returns (last id seen, rows archived); the id is None when none are left.
+@transaction.atomic
+def archive_batch(cutoff, batch_size, after_id=0):
+    candidates = archivable_tasks(cutoff).filter(id__gt=after_id).order_by('id')
+    if connection.features.has_select_for_update_skip_locked:
+        # Rows a request is writing right now are left for the next run
+        candidates = candidates.select_for_update(skip_locked=True)
+    tasks = list(candidates[:batch_size])
+    if not tasks:
+        return None, 0
+
+    now = timezone.now()
+    # An id already in the archive raises IntegrityError and rolls the batch
+    # back, rather than deleting a task whose copy was not written
+    TaskArchive.objects.bulk_create(
+        [TaskArchive(archived_at=now, **{field: getattr(task, field) for field in ARCHIVED_FIELDS}) for task in tasks],
+    )
+    Task.objects.filter(id__in=[task.id for task in tasks]).delete()
+
+    by_user = {}
+    for task in tasks:
+        if task.user_id:
+            by_user.setdefault(task.user_id, []).append(task)
+    for user_id, archived in by_user.items():
+        record_task_changes(user_id, before=archived)
+    return tasks[-1].id, len(tasks)
+
+
+# Yield (last id, rows archived) per batch until no candidate is left
+def archive_tasks(cutoff, batch_size=1000, after_id=0):
+    while True:
+        after_id, count = archive_batch(cutoff, batch_size, after_id)
+        if after_id is None:
+            return
+        yield after_id, count
@@ -0,0 +1,13 @@
+from django.urls import path
+from . import async_views
+
+# Native async task endpoints, mounted under /api/async/ (see ASYNC_TASK_API)
+urlpatterns = [
+    path('tasks/', async_views.taskList, name='async-task-list'),
+    path('tasks/create/', async_views.taskCreate, name='async-task-create'),
+    path('tasks/<int:pk>/', async_views.taskDetail, name='async-task-detail'),
+    path('tasks/update/<int:pk>/', async_views.taskUpdate, name='async-task-update'),
+    path('tasks/delete/<int:pk>/', async_views.taskDelete, name='async-task-delete'),
+    path('tasks/<int:pk>/mark-complete/', async_views.mark_task_complete, name='async-mark-task-complete'),
+    path('tasks/<int:pk>/mark-incomplete/', async_views.mark_task_incomplete, name='async-mark-task-incomplete'),
+]
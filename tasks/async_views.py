@@ -0,0 +1,190 @@
+import json
+from functools import wraps
+
+from asgiref.sync import sync_to_async
+from django.http import HttpResponse, JsonResponse
+from django.views.decorators.csrf import csrf_exempt
+from rest_framework import status
+from rest_framework.authentication import CSRFCheck, SessionAuthentication
+from rest_framework.exceptions import APIException
+from rest_framework.request import Request
+from rest_framework.settings import api_settings
+
+from .cache import page_cache
+from .changes import aget_task_stamp
+from .conditional import TaskValidators
+from .models import Task
+from .pagination import KeysetPagination
+from .serializers import TaskRowSerializer, TaskSerializer, get_task_fields
+from .views import TaskViewSet, create_task, delete_task, filter_tasks, set_task_status, update_task
+
+# Native async versions of the task endpoints, mounted under /api/async/.
+#
+# Reads run entirely on the async ORM. Writes validate in the event loop and
+# then hop to a thread once, because the write and its bookkeeping
+# (counters, change stamp) must share a transaction and Django's async ORM
+# cannot open one.
+
+
+def _csrf_failure(request):
+    check = CSRFCheck(lambda req: None)
+    check.process_request(request)
+    return check.process_view(request, None, (), {})
+
+
+# Authenticate with DRF's DEFAULT_AUTHENTICATION_CLASSES, in order, like the
+# sync API. Classes with an aauthenticate() run on the event loop; the
+# session uses the async session API (with DRF's CSRF rules for unsafe
+# methods); any other class runs on a thread.
+async def authenticate(request):
+    for auth_class in api_settings.DEFAULT_AUTHENTICATION_CLASSES:
+        authenticator = auth_class()
+        if isinstance(authenticator, SessionAuthentication):
+            user = await request.auser()
+            if not user.is_authenticated:
+                continue
+            if request.method not in ('GET', 'HEAD', 'OPTIONS') and _csrf_failure(request) is not None:
+                continue
+            return user
+        if hasattr(authenticator, 'aauthenticate'):
+            result = await authenticator.aauthenticate(request)
+        else:
+            result = await sync_to_async(authenticator.authenticate)(request)
+        if result is not None:
+            return result[0]
+    return None
+
+
+def error(detail, code):
+    return JsonResponse({'detail': detail}, status=code)
+
+
+# Async counterpart of @api_view + IsAuthenticated for these endpoints. The
+# view receives a DRF Request (for query_params) with the user set.
+def async_task_view(methods):
+    def decorator(view):
+        @csrf_exempt
+        @wraps(view)
+        async def wrapper(request, *args, **kwargs):
+            if request.method not in methods:
+                return error(f'Method "{request.method}" not allowed.', status.HTTP_405_METHOD_NOT_ALLOWED)
+            try:
+                user = await authenticate(request)
+            except APIException as exc:
+                return error(str(exc.detail), exc.status_code)
+            if user is None:
+                return error('Authentication credentials were not provided.', status.HTTP_401_UNAUTHORIZED)
+
+            drf_request = Request(request)
+            drf_request.user = user
+            try:
+                return await view(drf_request, *args, **kwargs)
+            except APIException as exc:  # e.g. an invalid pagination cursor
+                return error(str(exc.detail), exc.status_code)
+        return wrapper
+    return decorator
+
+
+def parse_body(request):
+    try:
+        data = json.loads(request.body or b'{}')
+    except ValueError:
+        return None
+    if not isinstance(data, dict):
+        return None
+    data.pop('user', None)  # The owner always comes from the request
+    return data
+
+
+async def get_task(request, pk):
+    try:
+        return await Task.objects.aget(id=pk, user=request.user)
+    except Task.DoesNotExist:
+        return None
+
+
+@async_task_view(['GET'])
+async def taskList(request):
+    fields = get_task_fields(request.query_params)
+    validators = TaskValidators(request, stamp=await aget_task_stamp(request.user))
+    not_modified = validators.not_modified()
+    if not_modified is not None:
+        return not_modified
+
+    data = await page_cache.aget(request, validators)
+    if data is None:
+        tasks = filter_tasks(Task.objects.filter(user=request.user), request.query_params)
+        rows = TaskRowSerializer(fields)
+        paginator = KeysetPagination()
+        page = await paginator.apaginate_queryset(rows.values(tasks, extra=TaskViewSet.ordering), request, view=TaskViewSet)
+        data = paginator.get_paginated_response(rows.serialize(page)).data
+        await page_cache.aset(request, validators, data)
+    return validators.apply(JsonResponse(data))
+
+
+@async_task_view(['GET'])
+async def taskDetail(request, pk):
+    fields = get_task_fields(request.query_params)
+    validators = TaskValidators(request, stamp=await aget_task_stamp(request.user))
+    not_modified = validators.not_modified()
+    if not_modified is not None:
+        return not_modified
+
+    rows = TaskRowSerializer(fields)
+    row = await rows.values(Task.objects.filter(id=pk, user=request.user)).afirst()
+    if row is None:
+        return error('Not found.', status.HTTP_404_NOT_FOUND)
+    return validators.apply(JsonResponse(rows.serialize([row])[0]))
+
+
+@async_task_view(['POST'])
+async def taskCreate(request):
+    data = parse_body(request)
+    if data is None:
+        return error('Expected a JSON object.', status.HTTP_400_BAD_REQUEST)
+
+    serializer = TaskSerializer(data=data)
+    if not serializer.is_valid():
+        return JsonResponse(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+    await sync_to_async(create_task)(serializer, request.user)
+    return JsonResponse(serializer.data, status=status.HTTP_201_CREATED)
+
+
+@async_task_view(['PUT'])
+async def taskUpdate(request, pk):
+    task = await get_task(request, pk)
+    if task is None:
+        return error('Not found.', status.HTTP_404_NOT_FOUND)
+    data = parse_body(request)
+    if data is None:
+        return error('Expected a JSON object.', status.HTTP_400_BAD_REQUEST)
+
+    serializer = TaskSerializer(instance=task, data=data)
+    if not serializer.is_valid():
+        return JsonResponse(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+    await sync_to_async(update_task)(serializer)
+    return JsonResponse(serializer.data)
+
+
+@async_task_view(['DELETE'])
+async def taskDelete(request, pk):
+    task = await get_task(request, pk)
+    if task is None:
+        return error('Not found.', status.HTTP_404_NOT_FOUND)
+    await sync_to_async(delete_task)(task)
+    return HttpResponse(status=status.HTTP_204_NO_CONTENT)
+
+
+async def _set_status(request, pk, new_status, message):
+    data, code = await sync_to_async(set_task_status)(request.user, pk, new_status, message)
+    return JsonResponse(data, status=code)
+
+
+@async_task_view(['POST'])
+async def mark_task_complete(request, pk):
+    return await _set_status(request, pk, Task.STATUS_COMPLETED, 'Task is already marked as complete.')
+
+
+@async_task_view(['POST'])
+async def mark_task_incomplete(request, pk):
+    return await _set_status(request, pk, Task.STATUS_PENDING, 'Task is already marked as incomplete.')
@@ -0,0 +1,117 @@
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import transaction
+from django.utils.translation import gettext_lazy as _
+from rest_framework.authentication import TokenAuthentication
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.settings import api_settings as jwt_settings
+from rest_framework_simplejwt.utils import get_md5_hash_password
+
+from .timing import span
+
+# Short-lived cache of authenticated users, so chatty API clients do not pay
+# a User lookup on every request before the view runs its own queries.
+#
+# Entries are dropped by invalidate_cached_user() whenever the API changes
+# a user. With the default per-process cache another worker may keep its
+# copy until AUTH_USER_CACHE_TIMEOUT expires, which bounds how long a
+# deactivated user or a revoked token can still authenticate there.
+
+def get_cache_timeout():
+    return getattr(settings, 'AUTH_USER_CACHE_TIMEOUT', 30)
+
+def user_cache_key(user_id):
+    return f'auth:user:{user_id}'
+
+def token_cache_key(key):
+    return f'auth:token:{key}'
+
+# Drop the cached copy once the surrounding transaction has committed, so
+# a concurrent request cannot cache the old row again in between
+def invalidate_cached_user(user):
+    user_id = getattr(user, 'pk', user)
+    transaction.on_commit(lambda: cache.delete(user_cache_key(user_id)))
+
+
+# Same checks as JWTAuthentication.get_user, for a cached copy of the user
+def check_jwt_user(user, validated_token):
+    if not user.is_active:
+        raise AuthenticationFailed(_('User is inactive'), code='user_inactive')
+    if jwt_settings.CHECK_REVOKE_TOKEN and \
+            validated_token.get(jwt_settings.REVOKE_TOKEN_CLAIM) != get_md5_hash_password(user.password):
+        raise AuthenticationFailed(_("The user's password has been changed."), code='password_changed')
+    return user
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    def authenticate(self, request):
+        with span('auth'):
+            return super().authenticate(request)
+
+    def get_user(self, validated_token):
+        user_id = validated_token.get(jwt_settings.USER_ID_CLAIM)
+        if user_id is None:
+            return super().get_user(validated_token)
+
+        user = cache.get(user_cache_key(user_id))
+        if user is None:
+            user = super().get_user(validated_token)
+            cache.set(user_cache_key(user_id), user, get_cache_timeout())
+            return user
+        return check_jwt_user(user, validated_token)
+
+    # Async counterpart of authenticate() for the native async views. Token
+    # validation is pure CPU; the user comes from the cache or the async ORM.
+    async def aauthenticate(self, request):
+        with span('auth'):
+            return await self._aauthenticate(request)
+
+    async def _aauthenticate(self, request):
+        header = self.get_header(request)
+        if header is None:
+            return None
+        raw_token = self.get_raw_token(header)
+        if raw_token is None:
+            return None
+
+        validated_token = self.get_validated_token(raw_token)
+        user_id = validated_token.get(jwt_settings.USER_ID_CLAIM)
+        if user_id is None:
+            raise AuthenticationFailed(_('Token contained no recognizable user identification'), code='bad_token')
+
+        user = await cache.aget(user_cache_key(user_id))
+        if user is None:
+            try:
+                user = await get_user_model().objects.aget(**{jwt_settings.USER_ID_FIELD: user_id})
+            except get_user_model().DoesNotExist:
+                raise AuthenticationFailed(_('User not found'), code='user_not_found')
+            check_jwt_user(user, validated_token)
+            await cache.aset(user_cache_key(user_id), user, get_cache_timeout())
+            return user, validated_token
+        return check_jwt_user(user, validated_token), validated_token
+
+
+class CachedTokenAuthentication(TokenAuthentication):
+    def authenticate(self, request):
+        with span('auth'):
+            return super().authenticate(request)
+
+    def authenticate_credentials(self, key):
+        cached = cache.get(token_cache_key(key))
+        if cached is not None:
+            user = cache.get(user_cache_key(cached.user_id))
+            if user is not None:
+                if not user.is_active:
+                    raise AuthenticationFailed(_('User inactive or deleted.'))
+                cached.user = user
+                return (user, cached)
+
+        user, token = super().authenticate_credentials(key)
+        timeout = get_cache_timeout()
+        # Cache the token without its user; the user is cached (and
+        # invalidated) on its own
+        cache.set(token_cache_key(key), self.get_model()(key=token.key, user_id=token.user_id, created=token.created), timeout)
+        cache.set(user_cache_key(user.pk), user, timeout)
+        return (user, token)
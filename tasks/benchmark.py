@@ -0,0 +1,101 @@
+import random
+import time
+from contextlib import contextmanager
+from datetime import timedelta
+
+from django.contrib.auth.hashers import make_password
+from django.db import connection
+from django.test.utils import setup_test_environment, teardown_test_environment
+from django.utils import timezone
+
+from .models import Task, User
+
+
+# Helpers shared by the benchmark management commands
+
+def get_bench_user(username):
+    user, _ = User.objects.get_or_create(username=username, defaults={'email': f'{username}@bench.invalid'})
+    return user
+
+
+# Insert `count` users named "<prefix>-<n>" that share one password hash,
+# so seeding does not pay for hashing per user
+def seed_users(prefix, count, password, batch_size=1000):
+    encoded = make_password(password)
+    users = [
+        User(username=f'{prefix}-{i}', email=f'{prefix}-{i}@bench.invalid', password=encoded)
+        for i in range(count)
+    ]
+    return User.objects.bulk_create(users, batch_size=batch_size)
+
+
+# Insert `count` synthetic tasks for `user` in fixed-size bulk_create batches
+def seed_tasks(user, count, batch_size=5000, seed=0):
+    rng = random.Random(seed)
+    today = timezone.now().date()
+    priorities = [Task.PRIORITY_LOW, Task.PRIORITY_MEDIUM, Task.PRIORITY_HIGH]
+    created = 0
+
+    while created < count:
+        batch = []
+        for i in range(created, min(created + batch_size, count)):
+            completed = rng.random() < 0.3
+            batch.append(Task(
+                title=f'Benchmark task {i}',
+                description='Seeded by the benchmark commands. ' * rng.randint(1, 8),
+                due_date=today + timedelta(days=rng.randint(-180, 365)),
+                priority=rng.choice(priorities),
+                status=Task.STATUS_COMPLETED if completed else Task.STATUS_PENDING,
+                completed_at=timezone.now() if completed else None,
+                user=user,
+            ))
+        Task.objects.bulk_create(batch)
+        created += len(batch)
+
+    return created
+
+
+# Run `func` `repeat` times and return the per-call durations in milliseconds
+def time_calls(func, repeat):
+    durations = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        durations.append((time.perf_counter() - start) * 1000)
+    return durations
+
+
+def percentile(values, pct):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+# Test settings for in-process clients (e.g. the "testserver" host); a
+# no-op when already active, as under the test runner
+@contextmanager
+def test_environment():
+    try:
+        setup_test_environment()
+    except RuntimeError:
+        yield
+        return
+    try:
+        yield
+    finally:
+        teardown_test_environment()
+
+
+# Run the body against a freshly created and migrated test database, as the
+# test runner does, and destroy it afterwards; for benchmarks that change
+# the schema or churn through rows
+@contextmanager
+def throwaway_database(verbosity=0):
+    old_name = connection.settings_dict['NAME']
+    connection.creation.create_test_db(verbosity=verbosity, autoclobber=True, serialize=False)
+    try:
+        yield
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity)
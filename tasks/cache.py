@@ -0,0 +1,107 @@
+import hashlib
+import threading
+
+from django.core.cache import caches
+from django.core.cache.backends.locmem import LocMemCache
+
+
+# Process-local counters for the task page cache
+class CacheStats:
+    FIELDS = ('hits', 'misses', 'sets', 'evictions', 'bypassed')
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.reset()
+
+    def incr(self, name, amount=1):
+        with self.lock:
+            self.counts[name] += amount
+
+    def reset(self):
+        with self.lock:
+            self.counts = dict.fromkeys(self.FIELDS, 0)
+
+    def snapshot(self):
+        with self.lock:
+            counts = dict(self.counts)
+        lookups = counts['hits'] + counts['misses']
+        counts['hit_ratio'] = round(counts['hits'] / lookups, 4) if lookups else None
+        return counts
+
+
+stats = CacheStats()
+
+
+# LocMemCache keeps entries in LRU order and culls the oldest when full;
+# this only counts what gets culled. Set CULL_FREQUENCY to MAX_ENTRIES to
+# evict exactly one entry at a time.
+class CountingLocMemCache(LocMemCache):
+    def _cull(self):
+        before = len(self._cache)
+        super()._cull()
+        stats.incr('evictions', before - len(self._cache))
+
+
+# Cache of serialized task list pages.
+#
+# Keys embed the user's TaskChangeStamp (version and modified_at), so a
+# task write through any view makes every cached page of that user
+# unreachable at once, in every worker process, without having to find
+# and delete the entries. Superseded entries age out through LRU eviction
+# and the TTL. Users whose tasks were never written through the tracked
+# paths have no stamp yet and are not cached.
+class TaskPageCache:
+    def __init__(self, alias='task_pages'):
+        self.alias = alias
+
+    @property
+    def cache(self):
+        return caches[self.alias]
+
+    def make_key(self, request, validators):
+        # Pagination links are absolute, so the host is part of the key
+        params = sorted((key, sorted(values)) for key, values in request.query_params.lists())
+        raw = f'{request.get_host()}|{request.path}|{params}'
+        digest = hashlib.sha1(raw.encode()).hexdigest()
+        stamp = f'{validators.version}.{validators.modified_at.timestamp()}'
+        return f'tasks:{request.user.pk}:{stamp}:{digest}'
+
+    def get(self, request, validators):
+        if not validators.version:
+            stats.incr('bypassed')
+            return None
+        data = self.cache.get(self.make_key(request, validators))
+        stats.incr('misses' if data is None else 'hits')
+        return data
+
+    def set(self, request, validators, data):
+        if not validators.version:
+            return
+        self.cache.set(self.make_key(request, validators), data)
+        stats.incr('sets')
+
+    async def aget(self, request, validators):
+        if not validators.version:
+            stats.incr('bypassed')
+            return None
+        data = await self.cache.aget(self.make_key(request, validators))
+        stats.incr('misses' if data is None else 'hits')
+        return data
+
+    async def aset(self, request, validators, data):
+        if not validators.version:
+            return
+        await self.cache.aset(self.make_key(request, validators), data)
+        stats.incr('sets')
+
+    def get_stats(self):
+        counts = stats.snapshot()
+        cache = self.cache
+        if isinstance(cache, LocMemCache):
+            counts['entries'] = len(cache._cache)
+            counts['max_entries'] = cache._max_entries
+        counts['timeout'] = cache.default_timeout
+        return counts
+
+
+page_cache = TaskPageCache()
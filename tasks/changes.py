@@ -0,0 +1,64 @@
+from django.db import IntegrityError, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .events import publish_task_changes
+from .models import Task, TaskChangeStamp, TaskTombstone
+from .stats import apply_deltas
+
+
+# Record that `user`'s tasks changed (a User or a user id) and return the
+# new version. Call it inside the transaction that performs the write so
+# the stamp and the rows move together.
+def touch_tasks(user):
+    user_id = getattr(user, 'pk', user)
+    now = timezone.now()
+    stamps = TaskChangeStamp.objects.filter(user_id=user_id)
+    if not stamps.update(version=F('version') + 1, modified_at=now):
+        try:
+            with transaction.atomic():
+                TaskChangeStamp.objects.create(user_id=user_id, version=1, modified_at=now)
+            return 1
+        except IntegrityError:
+            # Another request created it first
+            stamps.update(version=F('version') + 1, modified_at=now)
+    return stamps.values_list('version', flat=True).get()
+
+
+# Current (version, modified_at) for the user; (0, None) until the first write
+def get_task_stamp(user):
+    stamp = TaskChangeStamp.objects.filter(user=user).values_list('version', 'modified_at').first()
+    return stamp or (0, None)
+
+async def aget_task_stamp(user):
+    stamp = await TaskChangeStamp.objects.filter(user=user).values_list('version', 'modified_at').afirst()
+    return stamp or (0, None)
+
+
+# Single entry point for task writes: bumps the change stamp, keeps the
+# per-user counters in step (replacing the `before` states with the
+# `after` ones) and logs the change for delta sync: `after` tasks get the
+# new version as change_seq, `before` tasks missing from `after` get a
+# tombstone. Subscribers of the user's change events hear about it once
+# the write commits. Call it inside the transaction that performs the write.
+# `rows` may select the `after` tasks instead of their ids (bulk writes).
+def record_task_changes(user, before=(), after=(), rows=None):
+    user_id = getattr(user, 'pk', user)
+    # Bumping the stamp first locks its row, serializing this user's writers,
+    # so change_seq values commit in order
+    version = touch_tasks(user_id)
+    apply_deltas(user_id, before, after)
+
+    kept = {task.pk for task in after}
+    if kept:
+        (Task.objects.filter(pk__in=kept) if rows is None else rows).update(change_seq=version)
+        for task in after:
+            task.change_seq = version
+    previous = {task.pk for task in before if task.pk is not None}
+    removed = previous - kept
+    if removed:
+        now = timezone.now()
+        TaskTombstone.objects.bulk_create([
+            TaskTombstone(user_id=user_id, task_id=pk, change_seq=version, deleted_at=now) for pk in removed
+        ])
+    publish_task_changes(user_id, version, previous, kept)
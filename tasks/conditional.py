@@ -0,0 +1,48 @@
+import hashlib
+
+from django.utils import timezone
+from django.utils.cache import get_conditional_response, patch_vary_headers
+from django.utils.http import http_date, quote_etag
+
+from .changes import get_task_stamp
+
+
+# Conditional GET for task reads, driven by the user's TaskChangeStamp.
+# The ETag covers the stamp plus everything else that shapes the body
+# (path, query string and negotiated media type), so any task write
+# invalidates every list page and detail of that user at once.
+class TaskValidators:
+    def __init__(self, request, stamp=None):
+        self.request = request
+        self.version, self.modified_at = stamp or get_task_stamp(request.user)
+
+        key = '|'.join([
+            str(request.user.pk),
+            str(self.version),
+            request.get_full_path(),
+            request.META.get('HTTP_ACCEPT', ''),
+        ])
+        self.etag = quote_etag(hashlib.sha1(key.encode()).hexdigest())
+        # HTTP dates have one-second resolution; the ETag is exact. While the
+        # second of the last write is still running another write can land
+        # in it unnoticed, so Last-Modified is only sent (and
+        # If-Modified-Since only honoured) once that second is over.
+        self.last_modified = None
+        if self.modified_at is not None:
+            last_modified = int(self.modified_at.timestamp())
+            if int(timezone.now().timestamp()) > last_modified:
+                self.last_modified = last_modified
+
+    # A 304 response if the client's copy is current, else None
+    def not_modified(self):
+        response = get_conditional_response(self.request, etag=self.etag, last_modified=self.last_modified)
+        if response is not None:
+            self.apply(response)
+        return response
+
+    def apply(self, response):
+        response['ETag'] = self.etag
+        if self.last_modified is not None:
+            response['Last-Modified'] = http_date(self.last_modified)
+        patch_vary_headers(response, ('Accept', 'Authorization', 'Cookie'))
+        return response
@@ -0,0 +1,155 @@
+import asyncio
+import io
+import json
+from importlib import import_module
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib.auth import get_user
+from django.core.exceptions import DisallowedHost
+from django.core.handlers.asgi import ASGIRequest
+from django.db import close_old_connections
+from django.utils.functional import SimpleLazyObject
+from rest_framework.exceptions import APIException
+from rest_framework.request import Request
+from rest_framework.settings import api_settings
+
+from .changes import get_task_stamp
+from .events import RESYNC, get_broker
+
+# Server-sent events stream of the user's task changes (tasks/events.py).
+#
+# Served by task_management.asgi next to Django rather than through it:
+# Django runs every request in its own thread-sensitive context, which
+# keeps a thread alive for as long as the response streams. Here the
+# connection is authenticated on the shared thread pool and then costs
+# only two asyncio tasks and a queue while it idles, so one process can
+# hold thousands of them.
+#
+# Messages:
+#   event: ready   data: {"seq": N}  current change stamp version, on connect
+#   event: change  data: a tasks.events event; its "id:" is the seq
+#   event: resync  data: {}          events were missed; catch up through
+#                                    /api/tasks/changes/
+# plus a comment line every TASK_EVENTS_HEARTBEAT seconds. A browser
+# EventSource that reconnects sends Last-Event-ID, and gets a resync when
+# changes happened while it was away.
+
+EVENTS_PATH = '/api/async/tasks/events/'
+
+
+def get_heartbeat():
+    return getattr(settings, 'TASK_EVENTS_HEARTBEAT', 15)
+
+
+# Authenticate like the API does (token, session or JWT). Runs on the
+# shared thread pool, like current_version(), so their database
+# connections are managed here instead of by the request signals.
+def connect(request):
+    close_old_connections()
+    try:
+        request.get_host()  # Enforce ALLOWED_HOSTS
+        engine = import_module(settings.SESSION_ENGINE)
+        request.session = engine.SessionStore(request.COOKIES.get(settings.SESSION_COOKIE_NAME))
+        request.user = SimpleLazyObject(lambda: get_user(request))
+        user = Request(request, authenticators=[auth() for auth in api_settings.DEFAULT_AUTHENTICATION_CLASSES]).user
+        return user if user.is_authenticated else None
+    finally:
+        close_old_connections()
+
+
+def current_version(user):
+    close_old_connections()
+    try:
+        return get_task_stamp(user)[0]
+    finally:
+        close_old_connections()
+
+
+def format_event(event, data, event_id=None):
+    lines = [] if event_id is None else [f'id: {event_id}']
+    lines += [f'event: {event}', f"data: {json.dumps(data, separators=(',', ':'))}"]
+    return ('\n'.join(lines) + '\n\n').encode()
+
+
+class TaskEventStream:
+    def __init__(self, app, path=EVENTS_PATH):
+        self.app = app
+        self.path = path
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http' or scope['path'] != self.path:
+            return await self.app(scope, receive, send)
+        if scope['method'] != 'GET':
+            return await self.reject(send, 405, 'Method "{}" not allowed.'.format(scope['method']))
+
+        request = ASGIRequest(scope, io.BytesIO())
+        try:
+            user = await sync_to_async(connect, thread_sensitive=False)(request)
+        except DisallowedHost:
+            return await self.reject(send, 400, 'Invalid host header.')
+        except APIException as exc:
+            return await self.reject(send, exc.status_code, str(exc.detail))
+        if user is None:
+            return await self.reject(send, 401, 'Authentication credentials were not provided.')
+
+        # Subscribe before reading the version, so no change can commit
+        # unseen in between; events queued up to it are dropped by pump()
+        subscription = get_broker().subscribe(user.pk)
+        try:
+            seq = await sync_to_async(current_version, thread_sensitive=False)(user)
+            await send({
+                'type': 'http.response.start',
+                'status': 200,
+                'headers': [
+                    (b'content-type', b'text/event-stream'),
+                    (b'cache-control', b'no-cache'),
+                    (b'x-accel-buffering', b'no'),  # No proxy buffering (nginx)
+                ],
+            })
+            first = b'retry: 3000\n' + format_event('ready', {'seq': seq})
+            try:
+                if int(request.headers.get('Last-Event-ID', seq)) < seq:
+                    first += format_event('resync', {})
+            except ValueError:
+                pass
+
+            # Stream until either side goes away
+            pump = asyncio.ensure_future(self.pump(subscription, send, first, seq))
+            listen = asyncio.ensure_future(self.wait_for_disconnect(receive))
+            done, pending = await asyncio.wait({pump, listen}, return_when=asyncio.FIRST_COMPLETED)
+            for task in pending:
+                task.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
+            for task in done:
+                error = task.exception()
+                # A send to a client that went away just ends the stream
+                if error is not None and not isinstance(error, OSError):
+                    raise error
+        finally:
+            subscription.close()
+
+    async def pump(self, subscription, send, first, seq):
+        await send({'type': 'http.response.body', 'body': first, 'more_body': True})
+        heartbeat = get_heartbeat()
+        while True:
+            event = await subscription.get(heartbeat)
+            if event is None:
+                body = b': ping\n\n'
+            elif event is RESYNC:
+                body = format_event('resync', {})
+            elif event['seq'] <= seq:
+                continue  # Already covered by the ready seq
+            else:
+                body = format_event('change', event, event_id=event['seq'])
+            await send({'type': 'http.response.body', 'body': body, 'more_body': True})
+
+    @staticmethod
+    async def wait_for_disconnect(receive):
+        while (await receive())['type'] != 'http.disconnect':
+            pass
+
+    @staticmethod
+    async def reject(send, status, detail):
+        await send({'type': 'http.response.start', 'status': status, 'headers': [(b'content-type', b'application/json')]})
+        await send({'type': 'http.response.body', 'body': json.dumps({'detail': detail}).encode()})
@@ -0,0 +1,117 @@
+import asyncio
+import threading
+
+from django.conf import settings
+from django.db import transaction
+from django.utils.module_loading import import_string
+
+# Per-user task change events, pushed to clients by the SSE stream in
+# tasks/event_stream.py.
+#
+# record_task_changes() publishes one event per committed write:
+#   {"seq": <change stamp version>, "created": [ids], "updated": [ids], "deleted": [ids]}
+# Events carry ids only; clients fetch the rows from the delta sync
+# endpoint (/api/tasks/changes/?since=<cursor>).
+#
+# The broker is chosen with TASK_EVENTS_BACKEND. LocalBroker delivers
+# within this process only, which is enough for a single ASGI process or
+# for tests; a broker shared by all workers (Redis pub/sub, for one) plugs
+# in by implementing publish() and subscribe() the same way.
+
+# Put on a subscription whose queue overflowed: the client missed events
+# and should catch up through the delta sync endpoint
+RESYNC = object()
+
+
+class Subscription:
+    def __init__(self, broker, user_id, queue_size):
+        self.broker = broker
+        self.user_id = user_id
+        self.loop = asyncio.get_running_loop()
+        self.queue = asyncio.Queue(queue_size)
+        self.overflowed = False
+
+    # Thread-safe; called by the broker
+    def deliver(self, event):
+        try:
+            self.loop.call_soon_threadsafe(self._put, event)
+        except RuntimeError:
+            pass  # The loop is closed, the stream is gone
+
+    def _put(self, event):
+        if self.overflowed:
+            return
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            self.overflowed = True
+
+    # The next event, RESYNC after an overflow, or None after `timeout` seconds
+    async def get(self, timeout):
+        if self.overflowed and self.queue.empty():
+            self.overflowed = False
+            return RESYNC
+        try:
+            return await asyncio.wait_for(self.queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+    def close(self):
+        self.broker.unsubscribe(self)
+
+
+class LocalBroker:
+    def __init__(self, queue_size=100):
+        self.queue_size = queue_size
+        self.lock = threading.Lock()
+        self.subscribers = {}  # user id -> set of Subscription
+
+    # Call from the event loop the stream runs on
+    def subscribe(self, user_id):
+        subscription = Subscription(self, user_id, self.queue_size)
+        with self.lock:
+            self.subscribers.setdefault(user_id, set()).add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self.lock:
+            subscriptions = self.subscribers.get(subscription.user_id)
+            if subscriptions is not None:
+                subscriptions.discard(subscription)
+                if not subscriptions:
+                    del self.subscribers[subscription.user_id]
+
+    def publish(self, user_id, event):
+        with self.lock:
+            subscriptions = list(self.subscribers.get(user_id, ()))
+        for subscription in subscriptions:
+            subscription.deliver(event)
+
+    def count(self):
+        with self.lock:
+            return sum(len(subscriptions) for subscriptions in self.subscribers.values())
+
+
+_broker = None
+_broker_lock = threading.Lock()
+
+
+def get_broker():
+    global _broker
+    if _broker is None:
+        with _broker_lock:
+            if _broker is None:
+                backend = getattr(settings, 'TASK_EVENTS_BACKEND', 'tasks.events.LocalBroker')
+                _broker = import_string(backend)(**getattr(settings, 'TASK_EVENTS_OPTIONS', {}))
+    return _broker
+
+
+# Publish the change once the surrounding transaction commits
+def publish_task_changes(user_id, seq, before_ids, after_ids):
+    event = {
+        'seq': seq,
+        'created': sorted(after_ids - before_ids),
+        'updated': sorted(after_ids & before_ids),
+        'deleted': sorted(before_ids - after_ids),
+    }
+    transaction.on_commit(lambda: get_broker().publish(user_id, event))
@@ -0,0 +1,53 @@
+import csv
+import json
+from itertools import chain
+
+from .serializers import TaskRowSerializer
+
+# Rows streamed per chunk written to the response
+EXPORT_CHUNK_ROWS = 500
+
+
+# Stands in for a file so csv.writer hands back each formatted line
+class _Echo:
+    def write(self, value):
+        return value
+
+
+def _chunked(lines):
+    chunk = []
+    for line in lines:
+        chunk.append(line)
+        if len(chunk) >= EXPORT_CHUNK_ROWS:
+            yield ''.join(chunk)
+            chunk = []
+    if chunk:
+        yield ''.join(chunk)
+
+
+def _rows(queryset, serializer):
+    # iterator() uses a server-side cursor on Postgres and fetchmany() on
+    # SQLite, so only one chunk of rows is held in memory at a time
+    for row in serializer.values_list(queryset).iterator(chunk_size=2000):
+        yield serializer.format(row)
+
+
+def stream_ndjson(queryset):
+    serializer = TaskRowSerializer()
+    names = serializer.names
+    lines = (json.dumps(dict(zip(names, row))) + '\n' for row in _rows(queryset, serializer))
+    return _chunked(lines)
+
+
+def stream_csv(queryset):
+    serializer = TaskRowSerializer()
+    writer = csv.writer(_Echo())
+    header = [writer.writerow(serializer.names)]
+    lines = (writer.writerow(row) for row in _rows(queryset, serializer))
+    return _chunked(chain(header, lines))
+
+
+EXPORT_FORMATS = {
+    'ndjson': (stream_ndjson, 'application/x-ndjson'),
+    'csv': (stream_csv, 'text/csv'),
+}
@@ -0,0 +1,48 @@
+from django.core.exceptions import ValidationError
+from django.db import models
+from django.utils.functional import cached_property
+
+
+# A choice field stored as a small integer code.
+#
+# Python code, forms and serializers keep seeing the choice values
+# ('Low', 'Pending', ...); the database stores `codes[value]`. That keeps
+# the column and its indexes compact and makes SQL ordering follow the
+# codes (Low < Medium < High) instead of the alphabet. Lookups take the
+# choice values: filter(priority='High') becomes "priority = 3".
+class CompactChoiceField(models.PositiveSmallIntegerField):
+    def __init__(self, *args, codes=None, **kwargs):
+        self.codes = dict(codes or {})
+        self.values_by_code = {code: value for value, code in self.codes.items()}
+        super().__init__(*args, **kwargs)
+
+    def deconstruct(self):
+        name, path, args, kwargs = super().deconstruct()
+        kwargs['codes'] = self.codes
+        return name, path, args, kwargs
+
+    # The integer range validators would compare them against strings
+    @cached_property
+    def validators(self):
+        return list(self._validators)
+
+    def from_db_value(self, value, expression, connection):
+        if value is None:
+            return value
+        return self.values_by_code.get(value, value)
+
+    def to_python(self, value):
+        if value is None or value in self.codes:
+            return value
+        if value in self.values_by_code:
+            return self.values_by_code[value]
+        raise ValidationError(self.error_messages['invalid_choice'], code='invalid_choice', params={'value': value})
+
+    def get_prep_value(self, value):
+        if value is None or isinstance(value, models.expressions.Expression):
+            return value
+        if value in self.codes:
+            return self.codes[value]
+        if value in self.values_by_code:
+            return value
+        raise ValueError(f'{self.name!r} must be one of {", ".join(self.codes)}, not {value!r}.')
@@ -0,0 +1,117 @@
+import csv
+import io
+import json
+import time
+
+from django.db import transaction
+from rest_framework.exceptions import ValidationError
+
+from .changes import record_task_changes
+from .models import Task
+from .serializers import TaskSerializer
+
+IMPORT_FORMATS = ('csv', 'ndjson')
+
+# Columns that are always ignored on import: ids are assigned by the
+# database and the owner is the importing user. This also lets an export
+# be loaded back unchanged.
+IGNORED_COLUMNS = ('id', 'user')
+
+
+def guess_format(filename):
+    return 'csv' if filename.lower().endswith('.csv') else 'ndjson'
+
+
+# Yield (line number, row dict or None, error) from a binary file object,
+# reading it incrementally
+def iter_rows(stream, fmt):
+    text = io.TextIOWrapper(stream, encoding='utf-8', newline='')
+    try:
+        if fmt == 'csv':
+            reader = csv.DictReader(text)
+            for row in reader:
+                # Blank cells mean "not provided"
+                yield reader.line_num, {k: v for k, v in row.items() if k and v not in ('', None)}, None
+        else:
+            for line_num, line in enumerate(text, start=1):
+                if not line.strip():
+                    continue
+                try:
+                    row = json.loads(line)
+                except ValueError as exc:
+                    yield line_num, None, {'non_field_errors': [f'Invalid JSON: {exc}']}
+                    continue
+                if not isinstance(row, dict):
+                    yield line_num, None, {'non_field_errors': ['Expected a JSON object.']}
+                    continue
+                yield line_num, row, None
+    finally:
+        # Leave the underlying upload open for its owner to close
+        text.detach()
+
+
+# Validates rows with TaskSerializer and inserts them in fixed-size
+# bulk_create batches. Only the current batch and the first `max_errors`
+# errors are kept in memory.
+class TaskImporter:
+    def __init__(self, user, batch_size=1000, max_errors=100, on_batch=None):
+        self.user = user
+        self.batch_size = batch_size
+        self.max_errors = max_errors
+        self.on_batch = on_batch
+        self.rows = 0
+        self.imported = 0
+        self.failed = 0
+        self.errors = []
+        self.pending = []
+        # One serializer validates every row; building a new one per row
+        # would re-create its fields each time
+        self.serializer = TaskSerializer()
+
+    def run(self, stream, fmt):
+        start = time.perf_counter()
+        for line_num, row, error in iter_rows(stream, fmt):
+            self.rows += 1
+            if error is None:
+                for column in IGNORED_COLUMNS:
+                    row.pop(column, None)
+                try:
+                    data = self.serializer.run_validation(row)
+                except ValidationError as exc:
+                    # Same shape as serializer.errors
+                    error = exc.detail if isinstance(exc.detail, dict) else {'non_field_errors': exc.detail}
+                else:
+                    self.pending.append(Task(**data, user=self.user))
+                    if len(self.pending) >= self.batch_size:
+                        self.flush()
+                    continue
+            self.add_error(line_num, error)
+        self.flush()
+        return self.summary(time.perf_counter() - start)
+
+    def add_error(self, line_num, error):
+        self.failed += 1
+        if len(self.errors) < self.max_errors:
+            self.errors.append({'line': line_num, 'errors': error})
+
+    def flush(self):
+        if not self.pending:
+            return
+        with transaction.atomic():
+            Task.objects.bulk_create(self.pending)
+            record_task_changes(self.user, after=self.pending)
+        self.imported += len(self.pending)
+        self.pending = []
+        if self.on_batch:
+            self.on_batch(self)
+
+    def summary(self, seconds):
+        return {
+            'rows': self.rows,
+            'imported': self.imported,
+            'failed': self.failed,
+            'errors': self.errors,
+            'errors_truncated': self.failed > len(self.errors),
+            'seconds': round(seconds, 3),
+            'rows_per_second': round(self.rows / seconds, 1) if seconds else None,
+        }
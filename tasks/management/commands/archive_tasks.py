@@ -0,0 +1,42 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from tasks.archive import archive_tasks, get_archive_cutoff
+
+
+class Command(BaseCommand):
+    help = (
+        'Move completed tasks older than TASK_ARCHIVE_AFTER_DAYS into TaskArchive in short batches. '
+        'Safe to stop at any point; the next run continues with the rows that are left.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, help='Archive tasks completed more than this many days ago')
+        parser.add_argument('--batch-size', type=int, default=1000)
+        parser.add_argument('--max-batches', type=int, help='Stop after this many batches')
+        parser.add_argument('--pause', type=float, default=0.0, help='Seconds to sleep between batches')
+        parser.add_argument('--after-id', type=int, default=0, help='Skip task ids up to this one (resume a run)')
+
+    def handle(self, *args, **options):
+        cutoff = get_archive_cutoff(options['days'])
+        start = time.perf_counter()
+        total = batches = 0
+        last_id = options['after_id']
+
+        for last_id, count in archive_tasks(cutoff, options['batch_size'], options['after_id']):
+            total += count
+            batches += 1
+            self.stdout.write(f'  {total} archived, up to task {last_id}', ending='\r')
+            if options['max_batches'] and batches >= options['max_batches']:
+                self.stdout.write('')
+                self.stdout.write(f'Stopped after {batches} batches; resume with --after-id {last_id}')
+                break
+            if options['pause']:
+                time.sleep(options['pause'])
+        else:
+            self.stdout.write('')
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Archived {total} tasks completed before {cutoff:%Y-%m-%d %H:%M} in {time.perf_counter() - start:.1f}s.'
+        ))
@@ -0,0 +1,300 @@
+import json
+import logging
+import secrets
+import time
+from datetime import timedelta
+
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from tasks.archive import archive_batch, get_archive_cutoff
+from tasks.benchmark import percentile, seed_tasks, seed_users, test_environment
+from tasks.models import Task, User, UserDeletion
+from tasks.stats import rebuild_stats
+
+PASSWORD = 'bench-password-1'
+
+
+def future(days=30):
+    return (timezone.now().date() + timedelta(days=days)).isoformat()
+
+
+def new_task(bench, i):
+    return {'title': f'Bench created {i}', 'description': 'Created by the benchmark.', 'due_date': future(), 'priority': 'Medium', 'status': 'Pending'}
+
+
+def import_file(bench, i):
+    rows = ''.join(
+        json.dumps({'title': f'Bench import {i}.{n}', 'description': 'Imported', 'due_date': future(), 'priority': 'Low', 'status': 'Pending'}) + '\n'
+        for n in range(10)
+    )
+    return {'file': SimpleUploadedFile('tasks.ndjson', rows.encode(), content_type='application/x-ndjson')}
+
+
+# A few new users per request; the bench user is staff
+def bulk_users(bench, i):
+    return {'users': [
+        {'username': f'{bench.prefix}-bulk-{i}-{n}', 'email': f'{bench.prefix}-bulk-{i}-{n}@bench.invalid', 'password': PASSWORD}
+        for n in range(5)
+    ]}
+
+
+def batch(bench, i):
+    return {
+        'create': [new_task(bench, f'{i}.{n}') for n in range(5)],
+        'update': [{'id': bench.task_id, 'title': f'Bench batch {i}'}],
+    }
+
+
+# One benchmarked route. `path` and `data` may be callables taking
+# (bench, request number); `pool` names a set of rows used up one per
+# request by destructive endpoints.
+class Endpoint:
+    def __init__(self, name, method, path, data=None, auth='jwt', format='json', pool=None):
+        self.name = name
+        self.method = method
+        self.path = path
+        self.data = data
+        self.auth = auth
+        self.format = format
+        self.pool = pool
+
+    def build(self, bench, i):
+        path = self.path(bench, i) if callable(self.path) else self.path
+        data = self.data(bench, i) if callable(self.data) else self.data
+        return path, data
+
+
+# Every route in tasks/urls.py (mounted under /api/), router endpoints included
+ENDPOINTS = [
+    # DefaultRouter
+    Endpoint('router:api-root', 'get', '/api/api/'),
+    Endpoint('router:user-list', 'get', '/api/api/users/'),
+    Endpoint('router:user-create', 'post', '/api/api/users/',
+             lambda b, i: {'username': f'{b.prefix}-new-{i}', 'email': f'new-{i}@bench.invalid', 'password': PASSWORD}),
+    Endpoint('router:user-detail', 'get', lambda b, i: f'/api/api/users/{b.user.id}/'),
+    # UserSerializer rejects the user's own username and email, so rename
+    Endpoint('router:user-update', 'put', lambda b, i: f'/api/api/users/{b.user.id}/',
+             lambda b, i: {'username': f'{b.prefix}-0-{i}', 'email': f'0-{i}@bench.invalid', 'password': PASSWORD}),
+    Endpoint('router:user-partial-update', 'patch', lambda b, i: f'/api/api/users/{b.user.id}/',
+             lambda b, i: {'bio': f'Bench {i}'}),
+    Endpoint('router:user-delete', 'delete', lambda b, i: f'/api/api/users/{b.take("users", i)}/', pool='users'),
+    Endpoint('router:task-list', 'get', '/api/api/tasks/'),
+    Endpoint('router:task-list-filtered', 'get', '/api/api/tasks/?status=Pending&priority=High'),
+    Endpoint('router:task-create', 'post', '/api/api/tasks/', new_task),
+    Endpoint('router:task-detail', 'get', lambda b, i: f'/api/api/tasks/{b.task_id}/'),
+    Endpoint('router:task-update', 'put', lambda b, i: f'/api/api/tasks/{b.task_id}/', new_task),
+    Endpoint('router:task-partial-update', 'patch', lambda b, i: f'/api/api/tasks/{b.task_id}/',
+             lambda b, i: {'title': f'Bench patch {i}'}),
+    Endpoint('router:task-delete', 'delete', lambda b, i: f'/api/api/tasks/{b.take("router-deletes", i)}/',
+             pool='router-deletes'),
+
+    # Function-based views
+    Endpoint('task-list', 'get', '/api/tasks/'),
+    Endpoint('task-list-filtered', 'get', '/api/tasks/?status=Pending&priority=High'),
+    Endpoint('task-create', 'post', '/api/tasks/create/', new_task),
+    Endpoint('task-batch', 'post', '/api/tasks/batch/', batch),
+    Endpoint('task-export', 'get', '/api/tasks/export/?fmt=ndjson'),
+    Endpoint('task-import', 'post', '/api/tasks/import/', import_file, format='multipart'),
+    Endpoint('task-cache-stats', 'get', '/api/tasks/cache-stats/'),
+    Endpoint('task-stats', 'get', '/api/tasks/stats/'),
+    Endpoint('task-search', 'get', '/api/tasks/search/?q=benchmark'),
+    Endpoint('task-changes', 'get', '/api/tasks/changes/?limit=100'),
+    Endpoint('task-archive-list', 'get', '/api/tasks/archive/'),
+    Endpoint('task-archive-detail', 'get', lambda b, i: f'/api/tasks/archive/{b.archived_id}/'),
+    Endpoint('user-bulk-create', 'post', '/api/users/bulk/', bulk_users),
+    # Reads the deletions router:user-delete queued for the same users
+    Endpoint('user-deletion-detail', 'get', lambda b, i: f'/api/users/deletions/{b.take("users", i)}/', pool='users'),
+    Endpoint('metrics', 'get', '/api/metrics/', auth='session'),
+    Endpoint('task-detail', 'get', lambda b, i: f'/api/tasks/{b.task_id}/'),
+    Endpoint('task-update', 'put', lambda b, i: f'/api/tasks/update/{b.task_id}/', new_task),
+    Endpoint('task-delete', 'delete', lambda b, i: f'/api/tasks/delete/{b.take("deletes", i)}/', pool='deletes'),
+    # The same tasks are completed and then reopened
+    Endpoint('mark-task-complete', 'post', lambda b, i: f'/api/tasks/{b.take("toggles", i)}/mark-complete/',
+             pool='toggles'),
+    Endpoint('mark-task-incomplete', 'post', lambda b, i: f'/api/tasks/{b.take("toggles", i)}/mark-incomplete/',
+             pool='toggles'),
+    # One task per request by id, completed and then reopened the same way
+    Endpoint('mark-tasks-complete', 'post', '/api/tasks/mark-complete/',
+             lambda b, i: {'ids': [b.take('bulk-toggles', i)]}, pool='bulk-toggles'),
+    Endpoint('mark-tasks-incomplete', 'post', '/api/tasks/mark-incomplete/',
+             lambda b, i: {'ids': [b.take('bulk-toggles', i)]}, pool='bulk-toggles'),
+
+    # Authentication and HTML views
+    Endpoint('token_obtain_pair', 'post', '/api/token/',
+             lambda b, i: {'username': b.user.username, 'password': PASSWORD}, auth=None),
+    Endpoint('token_refresh', 'post', '/api/token/refresh/', lambda b, i: {'refresh': b.refresh}, auth=None),
+    Endpoint('register', 'get', '/api/register/', auth=None),
+    Endpoint('login', 'get', '/api/login/', auth=None),
+    Endpoint('logout', 'post', '/api/logout/', auth='session', format=None),
+    Endpoint('profile-update', 'get', '/api/profile/update/', auth='session'),
+]
+
+
+class Command(BaseCommand):
+    help = (
+        'Seed users x tasks with bulk_create, then drive every route in tasks/urls.py through an '
+        'in-process client and report throughput, p50/p95/p99 latency and SQL queries per endpoint.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=10, help='Users to seed')
+        parser.add_argument('--tasks', type=int, default=1000, help='Tasks to seed per user')
+        parser.add_argument('--requests', type=int, default=100, help='Timed requests per endpoint')
+        parser.add_argument('--warmup', type=int, default=5, help='Untimed requests per endpoint')
+        parser.add_argument('--endpoint', action='append', dest='endpoints', help='Only run endpoints with this name')
+        parser.add_argument('--prefix', default='bench', help='Username prefix of the seeded users; each run appends a random suffix')
+        parser.add_argument('--json', dest='json_path', default='bench-results.json', help='Write the results here')
+        parser.add_argument('--keep', action='store_true', help='Keep the seeded rows afterwards')
+
+    def handle(self, *args, **options):
+        # Failed requests are counted per status code instead of logged
+        request_logger = logging.getLogger('django.request')
+        level = request_logger.level
+        request_logger.setLevel(logging.CRITICAL)
+        try:
+            with test_environment():
+                self.run(options)
+        finally:
+            request_logger.setLevel(level)
+
+    def run(self, options):
+        # Users of this run only, so cleaning up cannot touch anyone else's
+        self.prefix = f"{options['prefix']}-{secrets.token_hex(4)}"
+        endpoints = [e for e in ENDPOINTS if not options['endpoints'] or e.name in options['endpoints']]
+        if not endpoints:
+            self.stderr.write('No endpoint matches --endpoint.')
+            return
+
+        self.seed(options, endpoints)
+        self.client = Client(raise_request_exception=False)
+        self.client.force_login(self.user)
+        self.jwt = {'Authorization': f'Bearer {RefreshToken.for_user(self.user).access_token}'}
+        self.refresh = str(RefreshToken.for_user(self.user))
+
+        results = []
+        self.stdout.write(
+            f"{'endpoint':<28} {'req/s':>9} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'queries':>8}  status"
+        )
+        for endpoint in endpoints:
+            row = self.measure(endpoint, options['requests'], options['warmup'])
+            results.append(row)
+            self.user.refresh_from_db()
+            statuses = ' '.join(f'{code}x{count}' for code, count in sorted(row['status_codes'].items()))
+            self.stdout.write(
+                f"{row['endpoint']:<28} {row['requests_per_second']:>9} {row['p50_ms']:>8} {row['p95_ms']:>8} "
+                f"{row['p99_ms']:>8} {row['queries_per_request']:>8}  {statuses}"
+            )
+
+        report = {
+            'timestamp': timezone.now().isoformat(),
+            'database': connection.vendor,
+            'users': options['users'],
+            'tasks_per_user': options['tasks'],
+            'requests': options['requests'],
+            'results': results,
+        }
+        with open(options['json_path'], 'w') as fh:
+            json.dump(report, fh, indent=2)
+        self.stdout.write(self.style.SUCCESS(f"Results written to {options['json_path']}"))
+
+        if options['keep']:
+            self.stdout.write(f'Seeded users kept: {self.prefix}-*')
+        else:
+            User.objects.filter(username__startswith=f'{self.prefix}-').delete()
+            UserDeletion.objects.filter(username__startswith=f'{self.prefix}-').delete()
+
+    def seed(self, options, endpoints):
+        start = time.perf_counter()
+        users = seed_users(self.prefix, max(1, options['users']), PASSWORD)
+        for n, user in enumerate(users):
+            seed_tasks(user, options['tasks'], seed=n)
+
+        # The first user drives the requests; staff so taskCacheStats answers
+        self.user = users[0]
+        User.objects.filter(pk=self.user.pk).update(is_staff=True)
+        self.task_id = Task.objects.create(
+            title='Bench target', due_date=future(), priority='Medium', status='Pending', user=self.user,
+        ).id
+
+        archived = Task.objects.create(
+            title='Bench archived', description='Archived by the benchmark.', due_date=future(), priority='Low',
+            status='Completed', completed_at=timezone.now() - timedelta(days=3650), user=self.user,
+        )
+        archive_batch(get_archive_cutoff(), 1, after_id=archived.id - 1)
+        self.archived_id = archived.id
+
+        # Rows consumed one per request (plus warm-up) by destructive endpoints
+        size = options['requests'] + options['warmup']
+        self.pools = {}
+        for pool in {e.pool for e in endpoints if e.pool}:
+            if pool == 'users':
+                self.pools[pool] = [u.id for u in seed_users(f'{self.prefix}-spare', size, PASSWORD)]
+            else:
+                tasks = Task.objects.bulk_create([
+                    Task(title=f'Bench {pool} {i}', due_date=future(), priority='Low', status='Pending', user=self.user)
+                    for i in range(size)
+                ])
+                self.pools[pool] = [task.id for task in tasks]
+
+        # Without router:user-delete in this run nothing queues them
+        names = {e.name for e in endpoints}
+        if 'user-deletion-detail' in names and 'router:user-delete' not in names:
+            UserDeletion.objects.bulk_create([
+                UserDeletion(user_id=pk, username=username)
+                for pk, username in User.objects.filter(id__in=self.pools['users']).values_list('id', 'username')
+            ])
+
+        rebuild_stats([user.id for user in users])
+        self.stdout.write(
+            f"Seeded {len(users)} users x {options['tasks']} tasks in {time.perf_counter() - start:.1f}s"
+        )
+
+    def take(self, pool, i):
+        return self.pools[pool][i]
+
+    def measure(self, endpoint, count, warmup):
+        method = getattr(self.client, endpoint.method)
+        headers = self.jwt if endpoint.auth == 'jwt' else {}
+        latencies, status_codes, query_counts = [], {}, []
+
+        for i in range(warmup + count):
+            path, data = endpoint.build(self, i)
+            kwargs = {'headers': headers}
+            if data is not None:
+                kwargs['data'] = data
+            if endpoint.format == 'json' and endpoint.method != 'get':
+                kwargs['content_type'] = 'application/json'
+            if endpoint.auth == 'session':
+                self.client.force_login(self.user)
+
+            if i == warmup:
+                start_all = time.perf_counter()
+            with CaptureQueriesContext(connection) as queries:
+                start = time.perf_counter()
+                response = method(path, **kwargs)
+                # Drain streamed bodies so their queries are part of the request
+                if response.streaming:
+                    b''.join(response.streaming_content)
+                latency = (time.perf_counter() - start) * 1000
+            if i >= warmup:
+                latencies.append(latency)
+                query_counts.append(len(queries))
+                status_codes[response.status_code] = status_codes.get(response.status_code, 0) + 1
+        elapsed = time.perf_counter() - start_all if count else 0
+
+        return {
+            'endpoint': endpoint.name,
+            'method': endpoint.method.upper(),
+            'requests_per_second': round(count / elapsed, 1) if elapsed else 0.0,
+            'p50_ms': round(percentile(latencies, 50), 2),
+            'p95_ms': round(percentile(latencies, 95), 2),
+            'p99_ms': round(percentile(latencies, 99), 2),
+            'queries_per_request': round(sum(query_counts) / count, 1) if count else 0.0,
+            'status_codes': status_codes,
+        }
@@ -0,0 +1,120 @@
+import asyncio
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand
+from django.test import AsyncClient, Client
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from tasks.benchmark import get_bench_user, percentile, seed_tasks, test_environment
+from tasks.models import Task
+
+
+class Command(BaseCommand):
+    help = (
+        'Compare requests/sec and latency of the native async task endpoints (ASGI) '
+        'with the sync ones (WSGI, emulating a threaded gunicorn worker) at several concurrency levels.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--concurrency', type=int, nargs='+', default=[10, 100, 1000])
+        parser.add_argument('--requests', type=int, default=2000, help='Requests per run')
+        parser.add_argument('--tasks', type=int, default=500, help='Tasks seeded for the benchmark user')
+        parser.add_argument('--wsgi-threads', type=int, default=4, help='Request threads of the emulated WSGI worker')
+        parser.add_argument('--endpoint', default='tasks/', help='Path below /api/ and /api/async/')
+        parser.add_argument('--allow-cache', action='store_true', help='Let repeated requests hit the task page cache')
+        parser.add_argument('--json', dest='json_path', help='Also write the results to this file')
+        parser.add_argument('--keep', action='store_true', help='Keep the seeded rows afterwards')
+
+    def handle(self, *args, **options):
+        with test_environment():
+            self.run(options)
+
+    def run(self, options):
+        user = get_bench_user('bench-async')
+        missing = options['tasks'] - Task.objects.filter(user=user).count()
+        if missing > 0:
+            seed_tasks(user, missing)
+        self.auth = {'Authorization': f'Bearer {RefreshToken.for_user(user).access_token}'}
+        self.bust_cache = not options['allow_cache']
+
+        sync_url = f"/api/{options['endpoint']}"
+        async_url = f"/api/async/{options['endpoint']}"
+        results = []
+        self.stdout.write(f"{'mode':<6} {'clients':>8} {'req/s':>10} {'p50 ms':>9} {'p99 ms':>9}")
+
+        for concurrency in options['concurrency']:
+            for mode, runner, url in (
+                ('wsgi', lambda c, n, u: self.run_wsgi(c, n, u, options['wsgi_threads']), sync_url),
+                ('asgi', lambda c, n, u: asyncio.run(self.run_asgi(c, n, u)), async_url),
+            ):
+                elapsed, latencies, failures = runner(concurrency, options['requests'], url)
+                row = {
+                    'mode': mode,
+                    'concurrency': concurrency,
+                    'requests': options['requests'],
+                    'failures': failures,
+                    'requests_per_second': round(options['requests'] / elapsed, 1),
+                    'p50_ms': round(percentile(latencies, 50), 2),
+                    'p99_ms': round(percentile(latencies, 99), 2),
+                }
+                results.append(row)
+                self.stdout.write(
+                    f"{mode:<6} {concurrency:>8} {row['requests_per_second']:>10} {row['p50_ms']:>9} {row['p99_ms']:>9}"
+                    + (f'  ({failures} failed)' if failures else '')
+                )
+
+        if options['json_path']:
+            with open(options['json_path'], 'w') as fh:
+                json.dump(results, fh, indent=2)
+
+        if not options['keep']:
+            Task.objects.filter(user=user).delete()
+            user.delete()
+
+    def make_url(self, url, i):
+        return f'{url}?_={i}' if self.bust_cache else url
+
+    async def run_asgi(self, concurrency, total, url):
+        client = AsyncClient()
+        requests = iter(range(total))
+        latencies, failures = [], 0
+
+        async def worker():
+            nonlocal failures
+            for i in requests:
+                start = time.perf_counter()
+                response = await client.get(self.make_url(url, i), headers=self.auth)
+                latencies.append((time.perf_counter() - start) * 1000)
+                failures += response.status_code != 200
+
+        start = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        return time.perf_counter() - start, latencies, failures
+
+    # Up to `concurrency` requests are in flight; a pool of `threads` serves
+    # them, so latency includes time queued for a free worker thread
+    def run_wsgi(self, concurrency, total, url, threads):
+        local = threading.local()
+        in_flight = threading.BoundedSemaphore(concurrency)
+        latencies, failures = [], []
+
+        def call(i, submitted):
+            try:
+                if not hasattr(local, 'client'):
+                    local.client = Client()
+                response = local.client.get(self.make_url(url, i), headers=self.auth)
+                latencies.append((time.perf_counter() - submitted) * 1000)
+                if response.status_code != 200:
+                    failures.append(i)
+            finally:
+                in_flight.release()
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=threads) as pool:
+            for i in range(total):
+                in_flight.acquire()
+                pool.submit(call, i, time.perf_counter())
+        return time.perf_counter() - start, latencies, len(failures)
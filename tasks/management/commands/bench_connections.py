@@ -0,0 +1,120 @@
+import io
+import json
+import os
+import subprocess
+import sys
+import time
+from importlib.util import find_spec
+
+from django.conf import settings
+from django.core.handlers.wsgi import WSGIHandler
+from django.core.management.base import BaseCommand
+from django.db import connections
+from django.db.backends.signals import connection_created
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from tasks.benchmark import get_bench_user, percentile, seed_tasks
+from tasks.models import Task
+
+# Environment for each connection mode; each runs in a fresh process
+# because the database settings are read once at startup
+MODES = {
+    'per-request': {'DATABASE_POOL': 'false', 'DATABASE_CONN_MAX_AGE': '0'},
+    'persistent': {'DATABASE_POOL': 'false', 'DATABASE_CONN_MAX_AGE': '600'},
+    'pool': {'DATABASE_POOL': 'true', 'DATABASE_CONN_MAX_AGE': '0'},
+}
+
+
+class Command(BaseCommand):
+    help = (
+        'Compare per-request latency of a task detail request with a new database connection per '
+        'request, persistent health-checked connections and the connection pool.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=500)
+        parser.add_argument('--modes', nargs='+', choices=MODES, default=list(MODES))
+        parser.add_argument('--keep', action='store_true', help='Keep the seeded rows afterwards')
+        # Internal: run one mode in this process and print its result as JSON
+        parser.add_argument('--task-id', type=int, help='(internal)')
+
+    def handle(self, *args, **options):
+        if options['task_id']:
+            self.stdout.write(json.dumps(self.measure(options['task_id'], options['requests'])))
+            return
+
+        user = get_bench_user('bench-connections')
+        if not Task.objects.filter(user=user).exists():
+            seed_tasks(user, 1)
+        task_id = Task.objects.filter(user=user).values_list('id', flat=True).first()
+        connections.close_all()
+
+        self.stdout.write(f"{'mode':<12} {'mean ms':>9} {'p50 ms':>9} {'p99 ms':>9} {'connects':>9}")
+        for mode in options['modes']:
+            if mode == 'pool' and not self.pool_available():
+                self.stdout.write(f'{mode:<12} skipped: needs PostgreSQL with psycopg 3 and psycopg_pool')
+                continue
+            result = self.run_mode(mode, task_id, options['requests'])
+            self.stdout.write(
+                f"{mode:<12} {result['mean_ms']:>9} {result['p50_ms']:>9} {result['p99_ms']:>9} {result['connects']:>9}"
+            )
+
+        if not options['keep']:
+            Task.objects.filter(user=user).delete()
+            user.delete()
+
+    @staticmethod
+    def pool_available():
+        return settings.DATABASES['default']['ENGINE'] == 'django.db.backends.postgresql' and bool(find_spec('psycopg_pool'))
+
+    def run_mode(self, mode, task_id, count):
+        env = {**os.environ, **MODES[mode]}
+        output = subprocess.run(
+            [sys.executable, os.path.abspath(sys.argv[0]), 'bench_connections', '--task-id', str(task_id), '--requests', str(count)],
+            env=env, check=True, capture_output=True, text=True,
+        ).stdout
+        return json.loads(output.strip().splitlines()[-1])
+
+    # Drive full WSGI requests, so request_started/request_finished close
+    # or keep connections exactly as under gunicorn
+    def measure(self, task_id, count):
+        task = Task.objects.select_related('user').get(id=task_id)
+        token = str(RefreshToken.for_user(task.user).access_token)
+        connections.close_all()
+
+        opened = []
+        connection_created.connect(lambda **kwargs: opened.append(1), weak=False)
+        handler = WSGIHandler()
+        environ = {
+            'REQUEST_METHOD': 'GET',
+            'PATH_INFO': f'/api/tasks/{task_id}/',
+            'QUERY_STRING': '',
+            'SERVER_NAME': 'localhost',
+            'SERVER_PORT': '80',
+            'SERVER_PROTOCOL': 'HTTP/1.1',
+            'HTTP_HOST': 'localhost',
+            'HTTP_AUTHORIZATION': f'Bearer {token}',
+            'wsgi.url_scheme': 'http',
+            'wsgi.errors': sys.stderr,
+            'wsgi.version': (1, 0),
+            'wsgi.multithread': False,
+            'wsgi.multiprocess': True,
+            'wsgi.run_once': False,
+        }
+
+        latencies = []
+        for i in range(count + 10):
+            start = time.perf_counter()
+            response = handler({**environ, 'wsgi.input': io.BytesIO()}, lambda status, headers: None)
+            b''.join(response)
+            response.close()
+            if i >= 10:  # Warm-up
+                latencies.append((time.perf_counter() - start) * 1000)
+
+        return {
+            'mean_ms': round(sum(latencies) / len(latencies), 3),
+            'p50_ms': round(percentile(latencies, 50), 3),
+            'p99_ms': round(percentile(latencies, 99), 3),
+            # Connections opened (checkouts, with the pool)
+            'connects': len(opened),
+        }
@@ -0,0 +1,83 @@
+from statistics import median
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.utils import timezone
+
+from tasks.benchmark import get_bench_user, percentile, seed_tasks, throwaway_database, time_calls
+from tasks.models import Task
+
+
+class Command(BaseCommand):
+    help = (
+        'Seed a large task table and print EXPLAIN plans and timings for the '
+        'per-user task queries with and without the Task indexes. Runs on a '
+        'throwaway test database, since it drops the indexes while it measures.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--tasks', type=int, default=100000, help='Tasks to seed for the benchmark user')
+        parser.add_argument('--noise-tasks', type=int, default=100000, help='Tasks to seed for a second user')
+        parser.add_argument('--repeat', type=int, default=50, help='Executions per query')
+
+    def handle(self, *args, **options):
+        with throwaway_database():
+            self.measure(options)
+
+    def measure(self, options):
+        user = get_bench_user('bench-indexes')
+        other = get_bench_user('bench-indexes-noise')
+
+        self.stdout.write(f"Seeding {options['tasks']} + {options['noise_tasks']} tasks...")
+        seed_tasks(user, options['tasks'], seed=1)
+        seed_tasks(other, options['noise_tasks'], seed=2)
+        self.analyze()
+
+        queries = self.get_queries(user)
+        indexes = Task._meta.indexes
+
+        try:
+            with connection.schema_editor() as editor:
+                for index in indexes:
+                    editor.remove_index(Task, index)
+            self.analyze()
+            before = self.run(queries, options['repeat'], 'WITHOUT task indexes')
+        finally:
+            with connection.schema_editor() as editor:
+                for index in indexes:
+                    editor.add_index(Task, index)
+            self.analyze()
+
+        after = self.run(queries, options['repeat'], 'WITH task indexes')
+
+        self.stdout.write(self.style.MIGRATE_HEADING(f'Summary ({connection.vendor}, median ms)'))
+        for name in queries:
+            self.stdout.write(f'  {name:<24} {before[name]:>9.3f} -> {after[name]:>9.3f}')
+
+    def get_queries(self, user):
+        today = timezone.now().date()
+        tasks = Task.objects.filter(user=user)
+        return {
+            'list page': tasks.order_by('due_date', 'id')[:50],
+            'status filter': tasks.filter(status=Task.STATUS_PENDING).order_by('due_date', 'id')[:50],
+            'priority filter': tasks.filter(priority=Task.PRIORITY_HIGH).order_by('due_date', 'id')[:50],
+            'due date filter': tasks.filter(due_date=today).order_by('due_date', 'id')[:50],
+            'pending overdue': tasks.filter(status=Task.STATUS_PENDING, due_date__lt=today).order_by('due_date', 'id')[:50],
+            'detail': tasks.filter(id=tasks.order_by('-id').values_list('id', flat=True)[:1].get()),
+        }
+
+    def run(self, queries, repeat, label):
+        self.stdout.write(self.style.MIGRATE_HEADING(label))
+        results = {}
+        for name, queryset in queries.items():
+            durations = time_calls(lambda: list(queryset.all()), repeat)
+            results[name] = median(durations)
+            self.stdout.write(self.style.SQL_KEYWORD(f'{name}: median {results[name]:.3f} ms, p95 {percentile(durations, 95):.3f} ms'))
+            for line in queryset.explain().splitlines():
+                self.stdout.write(f'    {line}')
+        return results
+
+    # Refresh planner statistics so both runs see the same table sizes
+    def analyze(self):
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE')
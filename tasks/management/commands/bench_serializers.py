@@ -0,0 +1,67 @@
+import gc
+import time
+import tracemalloc
+
+from django.core.management.base import BaseCommand
+
+from tasks.benchmark import get_bench_user, seed_tasks
+from tasks.models import Task
+from tasks.serializers import TaskRowSerializer, TaskSerializer
+
+
+def model_serializer(queryset):
+    return TaskSerializer(queryset, many=True).data
+
+
+def row_serializer(queryset):
+    rows = TaskRowSerializer()
+    return rows.serialize(rows.values(queryset))
+
+
+class Command(BaseCommand):
+    help = 'Compare rows/sec and peak memory of TaskSerializer and TaskRowSerializer for task lists.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 10000, 100000])
+        parser.add_argument('--repeat', type=int, default=3, help='Timed runs per size; the best is reported')
+        parser.add_argument('--keep', action='store_true', help='Keep the seeded rows afterwards')
+
+    def handle(self, *args, **options):
+        user = get_bench_user('bench-serializers')
+        missing = max(options['sizes']) - Task.objects.filter(user=user).count()
+        if missing > 0:
+            self.stdout.write(f'Seeding {missing} tasks...')
+            seed_tasks(user, missing)
+
+        candidates = [('TaskSerializer', model_serializer), ('TaskRowSerializer', row_serializer)]
+        self.stdout.write(f"{'rows':>8} {'serializer':<18} {'rows/sec':>12} {'peak MiB':>10}")
+
+        for size in options['sizes']:
+            queryset = Task.objects.filter(user=user).order_by('id')[:size]
+            for name, func in candidates:
+                # Timing and memory are measured in separate runs because
+                # tracemalloc slows allocation-heavy code down
+                best = min(self.timed(func, queryset) for _ in range(options['repeat']))
+                peak = self.peak_memory(func, queryset)
+                self.stdout.write(f'{size:>8} {name:<18} {size / best:>12,.0f} {peak / 2**20:>10.1f}')
+
+        if not options['keep']:
+            Task.objects.filter(user=user).delete()
+            user.delete()
+
+    @staticmethod
+    def timed(func, queryset):
+        gc.collect()
+        start = time.perf_counter()
+        func(queryset.all())
+        return time.perf_counter() - start
+
+    @staticmethod
+    def peak_memory(func, queryset):
+        gc.collect()
+        tracemalloc.start()
+        try:
+            func(queryset.all())
+            return tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
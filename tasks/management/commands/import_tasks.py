@@ -0,0 +1,43 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from tasks.importer import IMPORT_FORMATS, TaskImporter, guess_format
+from tasks.models import User
+
+
+class Command(BaseCommand):
+    help = 'Import tasks for a user from a CSV or NDJSON file in fixed-size batches.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='File to import')
+        parser.add_argument('--user', required=True, help='Username that will own the tasks')
+        parser.add_argument('--format', choices=IMPORT_FORMATS, help='Defaults to the file extension')
+        parser.add_argument('--batch-size', type=int, default=1000)
+        parser.add_argument('--max-errors', type=int, default=100, help='Row errors to report in full')
+
+    def handle(self, *args, **options):
+        try:
+            user = User.objects.get(username=options['user'])
+        except User.DoesNotExist:
+            raise CommandError(f"User '{options['user']}' does not exist.")
+
+        fmt = options['format'] or guess_format(options['path'])
+        importer = TaskImporter(
+            user,
+            batch_size=options['batch_size'],
+            max_errors=options['max_errors'],
+            on_batch=lambda imp: self.stdout.write(f'  {imp.imported} imported, {imp.failed} failed', ending='\r'),
+        )
+
+        with open(options['path'], 'rb') as stream:
+            result = importer.run(stream, fmt)
+
+        self.stdout.write('')
+        for error in result['errors']:
+            self.stderr.write(f"line {error['line']}: {error['errors']}")
+        if result['errors_truncated']:
+            self.stderr.write(f"... {result['failed'] - len(result['errors'])} more row errors not shown")
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Imported {result['imported']} of {result['rows']} rows in {result['seconds']}s "
+            f"({result['rows_per_second']} rows/sec), {result['failed']} failed."
+        ))
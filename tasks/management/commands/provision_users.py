@@ -0,0 +1,40 @@
+from django.core.management.base import BaseCommand
+
+from tasks.importer import IMPORT_FORMATS, guess_format, iter_rows
+from tasks.provisioning import UserProvisioner, get_hash_workers
+
+
+class Command(BaseCommand):
+    help = (
+        'Create users from a CSV or NDJSON file (username, email, password, bio), hashing passwords '
+        'on a process pool and inserting them in bulk_create batches.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='File to load')
+        parser.add_argument('--format', choices=IMPORT_FORMATS, help='Defaults to the file extension')
+        parser.add_argument('--batch-size', type=int, default=500)
+        parser.add_argument('--max-errors', type=int, default=100, help='Row errors to report in full')
+
+    def handle(self, *args, **options):
+        fmt = options['format'] or guess_format(options['path'])
+        provisioner = UserProvisioner(
+            batch_size=options['batch_size'],
+            max_errors=options['max_errors'],
+            on_batch=lambda p: self.stdout.write(f'  {len(p.created)} created, {p.failed} failed', ending='\r'),
+        )
+        self.stdout.write(f'Hashing passwords on {get_hash_workers()} processes')
+
+        with open(options['path'], 'rb') as stream:
+            result = provisioner.run(iter_rows(stream, fmt))
+
+        self.stdout.write('')
+        for error in result['errors']:
+            self.stderr.write(f"row {error['row']}: {error['errors']}")
+        if result['errors_truncated']:
+            self.stderr.write(f"... {result['failed'] - len(result['errors'])} more row errors not shown")
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Created {result['created']} of {result['rows']} users in {result['seconds']}s "
+            f"({result['users_per_second']} users/sec), {result['failed']} failed."
+        ))
@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+
+from tasks.sync import get_tombstone_cutoff, prune_tombstones
+
+
+class Command(BaseCommand):
+    help = (
+        'Delete task tombstones older than TASK_TOMBSTONE_DAYS. Clients whose sync cursor predates '
+        'the pruned tombstones get 410 Gone and sync again from scratch.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, help='Prune tombstones of deletes more than this many days ago')
+
+    def handle(self, *args, **options):
+        cutoff = get_tombstone_cutoff(options['days'])
+        deleted = prune_tombstones(cutoff)
+        self.stdout.write(self.style.SUCCESS(f'Pruned {deleted} tombstones from before {cutoff:%Y-%m-%d %H:%M}.'))
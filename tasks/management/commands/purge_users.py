@@ -0,0 +1,47 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from tasks.purge import purge_users
+
+
+class Command(BaseCommand):
+    help = (
+        'Delete the data of users whose deletion was requested, in short batches, and then the users. '
+        'Safe to stop at any point; the next run continues where this one stopped. Run it with --poll '
+        'as a long-lived worker process.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+        parser.add_argument('--max-batches', type=int, help='Stop after this many batches')
+        parser.add_argument('--pause', type=float, default=0.0, help='Seconds to sleep between batches')
+        parser.add_argument('--poll', type=float, help='Keep running, checking for new deletions every this many seconds')
+
+    def handle(self, *args, **options):
+        batches = 0
+        while True:
+            for deletion, count in purge_users(options['batch_size']):
+                batches += 1
+                if deletion.finished_at is not None:
+                    self.stdout.write('')
+                    self.stdout.write(self.style.SUCCESS(
+                        f'Deleted user {deletion.username} ({deletion.user_id}): {deletion.tasks_deleted} tasks, '
+                        f'{deletion.other_deleted} other rows.'
+                    ))
+                else:
+                    self.stdout.write(
+                        f'  {deletion.username}: {deletion.tasks_deleted}/{deletion.tasks_total} tasks deleted',
+                        ending='\r',
+                    )
+                if options['max_batches'] and batches >= options['max_batches']:
+                    self.stdout.write('')
+                    self.stdout.write(f'Stopped after {batches} batches; the next run continues from here')
+                    return
+                if options['pause']:
+                    time.sleep(options['pause'])
+            if options['poll'] is None:
+                return
+            close_old_connections()  # Do not hold a connection across idle polls
+            time.sleep(options['poll'])
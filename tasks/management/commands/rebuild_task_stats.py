@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from tasks.stats import rebuild_stats
+
+
+class Command(BaseCommand):
+    help = 'Recompute the per-user task counters from the Task table with one grouped aggregate query.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--user', type=int, action='append', dest='users', help='Only rebuild these user ids')
+
+    def handle(self, *args, **options):
+        count = rebuild_stats(options['users'])
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt task counters for {count} users.'))
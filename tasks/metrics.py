@@ -0,0 +1,235 @@
+import json
+import mmap
+import os
+import struct
+import threading
+import time
+from bisect import bisect_left
+from collections import defaultdict
+from functools import lru_cache
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+
+# Per-route request metrics, aggregated across worker processes.
+#
+# Every process adds to its own memory-mapped file in METRICS_DIR, so
+# recording never waits on another process; the scrape endpoint reads all
+# files and sums them. Files of exited workers are kept, which keeps the
+# counters monotonic across worker restarts; clear the directory when the
+# whole service is redeployed.
+#
+# File layout: an 8-byte header holding the used length, then entries of
+#   int32 key length | key (JSON [name, labels]) padded to 8 bytes | float64
+# A new entry is written before the header grows past it, so a reader
+# never sees a partial entry.
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100)
+
+FAMILIES = {
+    'tasks_http_requests_total': ('counter', 'Requests by URL name, route and method.'),
+    'tasks_http_responses_total': ('counter', 'Responses by URL name, route and status code.'),
+    'tasks_http_request_duration_seconds': ('histogram', 'Request latency in seconds.'),
+    'tasks_http_request_queries': ('histogram', 'SQL queries per request.'),
+}
+
+_INITIAL_SIZE = 64 * 1024
+
+
+class MmapValues:
+    def __init__(self, path):
+        self.lock = threading.Lock()
+        fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            if os.fstat(fd).st_size < _INITIAL_SIZE:
+                os.ftruncate(fd, _INITIAL_SIZE)
+            self.map = mmap.mmap(fd, 0)
+        finally:
+            os.close(fd)
+
+        self.used = struct.unpack_from('i', self.map, 0)[0]
+        if not self.used:
+            self.used = 8
+            struct.pack_into('i', self.map, 0, self.used)
+        self.positions = {key: pos for key, pos, _ in _entries(self.map, self.used)}
+
+    def inc(self, key, amount=1.0):
+        with self.lock:
+            pos = self.positions.get(key)
+            if pos is None:
+                pos = self.add(key)
+            value = struct.unpack_from('d', self.map, pos)[0]
+            struct.pack_into('d', self.map, pos, value + amount)
+
+    def add(self, key):
+        encoded = key.encode()
+        padded = len(encoded) + (-(4 + len(encoded)) % 8)
+        entry = struct.pack(f'=i{padded}sd', len(encoded), encoded, 0.0)
+        while self.used + len(entry) > len(self.map):
+            self.map.resize(len(self.map) * 2)
+
+        self.map[self.used:self.used + len(entry)] = entry
+        pos = self.used + 4 + padded
+        self.used += len(entry)
+        struct.pack_into('i', self.map, 0, self.used)
+        self.positions[key] = pos
+        return pos
+
+    def close(self):
+        self.map.close()
+
+
+# Yield (key, value position, value) for the entries of a mapped file
+def _entries(data, used):
+    pos = 8
+    while pos < used:
+        length = struct.unpack_from('i', data, pos)[0]
+        key = bytes(data[pos + 4:pos + 4 + length]).decode()
+        pos += 4 + length + (-(4 + length) % 8)
+        yield key, pos, struct.unpack_from('d', data, pos)[0]
+        pos += 8
+
+
+def read_values(path):
+    with open(path, 'rb') as fh:
+        data = fh.read()
+    if len(data) < 8:
+        return {}
+    return {key: value for key, _, value in _entries(data, struct.unpack_from('i', data, 0)[0])}
+
+
+def get_metrics_dir():
+    return settings.METRICS_DIR
+
+
+_store = None
+_store_key = None
+_store_lock = threading.Lock()
+
+
+# This process's store; reopened after a fork or a METRICS_DIR change
+def get_store():
+    global _store, _store_key
+    key = (get_metrics_dir(), os.getpid())
+    if _store_key != key:
+        with _store_lock:
+            if _store_key != key:
+                os.makedirs(key[0], exist_ok=True)
+                _store = MmapValues(os.path.join(key[0], f'metrics_{key[1]}.db'))
+                _store_key = key
+    return _store
+
+
+@lru_cache(maxsize=4096)
+def series_key(name, labels):
+    return json.dumps([name, dict(labels)], sort_keys=True)
+
+
+def bucket(value, bounds):
+    index = bisect_left(bounds, value)
+    return str(bounds[index]) if index < len(bounds) else '+Inf'
+
+
+def observe(store, name, labels, value, bounds):
+    store.inc(series_key(f'{name}_bucket', labels + (('le', bucket(value, bounds)),)))
+    store.inc(series_key(f'{name}_sum', labels), value)
+    store.inc(series_key(f'{name}_count', labels))
+
+
+def record_request(request, response, seconds, queries=None):
+    match = getattr(request, 'resolver_match', None)
+    # Routers and function views may share URL names, so the route is kept too
+    route = (('view', match.url_name or ''), ('route', match.route)) if match else (('view', ''), ('route', ''))
+    store = get_store()
+    store.inc(series_key('tasks_http_requests_total', route + (('method', request.method),)))
+    store.inc(series_key('tasks_http_responses_total', route + (('status', str(response.status_code)),)))
+    observe(store, 'tasks_http_request_duration_seconds', route, seconds, LATENCY_BUCKETS)
+    if queries is not None:
+        observe(store, 'tasks_http_request_queries', route, queries, QUERY_BUCKETS)
+
+
+def collect():
+    totals = defaultdict(float)
+    directory = get_metrics_dir()
+    if os.path.isdir(directory):
+        for filename in os.listdir(directory):
+            if filename.startswith('metrics_') and filename.endswith('.db'):
+                for key, value in read_values(os.path.join(directory, filename)).items():
+                    totals[key] += value
+    return totals
+
+
+def _format_labels(labels):
+    if not labels:
+        return ''
+    escaped = (
+        (name, str(value).replace('\\', r'\\').replace('\n', r'\n').replace('"', r'\"'))
+        for name, value in labels
+    )
+    return '{' + ','.join(f'{name}="{value}"' for name, value in escaped) + '}'
+
+
+def _format_value(value):
+    return str(int(value)) if value.is_integer() else repr(value)
+
+
+# Prometheus text exposition format (version 0.0.4) of all workers' metrics
+def render_metrics():
+    samples = defaultdict(dict)  # family -> {(name, labels): value}
+    for key, value in collect().items():
+        name, labels = json.loads(key)
+        family = next((f for f in FAMILIES if name == f or name.rsplit('_', 1)[0] == f), None)
+        if family is not None:
+            samples[family][(name, tuple(sorted(labels.items())))] = value
+
+    lines = []
+    for family, (kind, help_text) in FAMILIES.items():
+        lines.append(f'# HELP {family} {help_text}')
+        lines.append(f'# TYPE {family} {kind}')
+        series = samples.get(family, {})
+        if kind == 'counter':
+            for (name, labels), value in sorted(series.items()):
+                lines.append(f'{name}{_format_labels(labels)} {_format_value(value)}')
+            continue
+
+        bounds = LATENCY_BUCKETS if family == 'tasks_http_request_duration_seconds' else QUERY_BUCKETS
+        for labels in sorted({labels for name, labels in series if name.endswith('_count')}):
+            cumulative = 0.0
+            for bound in [str(b) for b in bounds] + ['+Inf']:
+                cumulative += series.get((f'{family}_bucket', tuple(sorted(labels + (('le', bound),)))), 0.0)
+                lines.append(f'{family}_bucket{_format_labels(labels + (("le", bound),))} {_format_value(cumulative)}')
+            lines.append(f'{family}_sum{_format_labels(labels)} {_format_value(series.get((f"{family}_sum", labels), 0.0))}')
+            lines.append(f'{family}_count{_format_labels(labels)} {_format_value(series.get((f"{family}_count", labels), 0.0))}')
+    return '\n'.join(lines) + '\n'
+
+
+# Records every request; put it first in MIDDLEWARE. The query count comes
+# from RequestTimingMiddleware when it runs inside this one.
+class MetricsMiddleware:
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        start = time.perf_counter()
+        response = self.get_response(request)
+        self.record(request, response, time.perf_counter() - start)
+        return response
+
+    async def __acall__(self, request):
+        start = time.perf_counter()
+        response = await self.get_response(request)
+        self.record(request, response, time.perf_counter() - start)
+        return response
+
+    def record(self, request, response, seconds):
+        timing = getattr(request, 'timing', None)
+        record_request(request, response, seconds, timing.queries if timing else None)
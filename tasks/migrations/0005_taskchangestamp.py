@@ -0,0 +1,23 @@
+# Generated by Django 5.1.2 on 2026-10-18 11:11
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0004_task_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TaskChangeStamp',
+            fields=[
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='task_stamp', serialize=False, to=settings.AUTH_USER_MODEL)),
+                ('version', models.BigIntegerField(default=0)),
+                ('modified_at', models.DateTimeField(blank=True, null=True)),
+            ],
+        ),
+    ]
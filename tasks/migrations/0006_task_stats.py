@@ -0,0 +1,66 @@
+# Generated by Django 5.1.2 on 2026-10-18 11:14
+
+import django.db.models.deletion
+from django.conf import settings
+from collections import Counter, defaultdict
+
+from django.db import migrations, models
+from django.db.models import Count
+
+
+# Seed the counters for existing tasks (same grouped aggregate as
+# tasks.stats.rebuild_stats, against the historical models)
+def backfill_stats(apps, schema_editor):
+    Task = apps.get_model('tasks', 'Task')
+    TaskStats = apps.get_model('tasks', 'TaskStats')
+    TaskDueCount = apps.get_model('tasks', 'TaskDueCount')
+    columns = {'Pending': 'pending', 'Completed': 'completed', 'Low': 'low', 'Medium': 'medium', 'High': 'high'}
+
+    totals = defaultdict(Counter)
+    pending_by_date = Counter()
+    rows = Task.objects.exclude(user=None).values('user', 'status', 'priority', 'due_date').annotate(n=Count('id')).order_by()
+    for row in rows:
+        totals[row['user']][columns[row['status']]] += row['n']
+        totals[row['user']][columns[row['priority']]] += row['n']
+        if row['status'] == 'Pending':
+            pending_by_date[row['user'], row['due_date']] += row['n']
+
+    TaskStats.objects.bulk_create([TaskStats(user_id=user_id, **counts) for user_id, counts in totals.items()], batch_size=1000)
+    TaskDueCount.objects.bulk_create(
+        [TaskDueCount(user_id=user_id, due_date=due_date, pending=n) for (user_id, due_date), n in pending_by_date.items()],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0005_taskchangestamp'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TaskStats',
+            fields=[
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='task_stats', serialize=False, to=settings.AUTH_USER_MODEL)),
+                ('pending', models.BigIntegerField(default=0)),
+                ('completed', models.BigIntegerField(default=0)),
+                ('low', models.BigIntegerField(default=0)),
+                ('medium', models.BigIntegerField(default=0)),
+                ('high', models.BigIntegerField(default=0)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='TaskDueCount',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('due_date', models.DateField()),
+                ('pending', models.BigIntegerField(default=0)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='task_due_counts', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('user', 'due_date'), name='task_due_count_user_date_uniq')],
+            },
+        ),
+        migrations.RunPython(backfill_stats, migrations.RunPython.noop),
+    ]
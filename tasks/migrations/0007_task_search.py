@@ -0,0 +1,65 @@
+from django.db import migrations
+
+# The search structures that tasks/search.py queries. The DDL lives here
+# rather than being imported, so later edits to that module cannot change
+# what this migration does; migrations that rebuild tasks_task carry their
+# own copy.
+SQLITE_SETUP = [
+    """CREATE VIRTUAL TABLE IF NOT EXISTS tasks_task_fts
+        USING fts5(title, description, content='tasks_task', content_rowid='id')""",
+    """CREATE TRIGGER IF NOT EXISTS tasks_task_fts_insert AFTER INSERT ON tasks_task BEGIN
+        INSERT INTO tasks_task_fts(rowid, title, description) VALUES (new.id, new.title, new.description);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS tasks_task_fts_delete AFTER DELETE ON tasks_task BEGIN
+        INSERT INTO tasks_task_fts(tasks_task_fts, rowid, title, description) VALUES ('delete', old.id, old.title, old.description);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS tasks_task_fts_update AFTER UPDATE ON tasks_task
+        WHEN old.title IS NOT new.title OR old.description IS NOT new.description BEGIN
+        INSERT INTO tasks_task_fts(tasks_task_fts, rowid, title, description) VALUES ('delete', old.id, old.title, old.description);
+        INSERT INTO tasks_task_fts(rowid, title, description) VALUES (new.id, new.title, new.description);
+    END""",
+    "INSERT INTO tasks_task_fts(tasks_task_fts) VALUES ('rebuild')",
+]
+PG_SETUP = [
+    "CREATE INDEX IF NOT EXISTS tasks_task_search_idx ON tasks_task USING gin "
+    "((to_tsvector('english', coalesce(title, '') || ' ' || coalesce(description, ''))))",
+]
+SQLITE_TEARDOWN = [
+    'DROP TRIGGER IF EXISTS tasks_task_fts_insert',
+    'DROP TRIGGER IF EXISTS tasks_task_fts_delete',
+    'DROP TRIGGER IF EXISTS tasks_task_fts_update',
+    'DROP TABLE IF EXISTS tasks_task_fts',
+]
+PG_TEARDOWN = ['DROP INDEX IF EXISTS tasks_task_search_idx']
+
+
+# Idempotent, so it can run again after a table rebuild
+def install_search(schema_editor):
+    vendor = schema_editor.connection.vendor
+    for sql in {'sqlite': SQLITE_SETUP, 'postgresql': PG_SETUP}.get(vendor, []):
+        schema_editor.execute(sql)
+
+
+def uninstall_search(schema_editor):
+    vendor = schema_editor.connection.vendor
+    for sql in {'sqlite': SQLITE_TEARDOWN, 'postgresql': PG_TEARDOWN}.get(vendor, []):
+        schema_editor.execute(sql)
+
+
+def forwards(apps, schema_editor):
+    install_search(schema_editor)
+
+
+def backwards(apps, schema_editor):
+    uninstall_search(schema_editor)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0006_task_stats'),
+    ]
+
+    operations = [
+        migrations.RunPython(forwards, backwards),
+    ]
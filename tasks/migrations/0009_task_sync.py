@@ -0,0 +1,91 @@
+# Generated by Django 5.1.2 on 2026-10-18 11:44
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+# The search DDL as of this migration, copied from 0007_task_search so later
+# changes there do not alter what this migration does
+SQLITE_SETUP = [
+    """CREATE VIRTUAL TABLE IF NOT EXISTS tasks_task_fts
+        USING fts5(title, description, content='tasks_task', content_rowid='id')""",
+    """CREATE TRIGGER IF NOT EXISTS tasks_task_fts_insert AFTER INSERT ON tasks_task BEGIN
+        INSERT INTO tasks_task_fts(rowid, title, description) VALUES (new.id, new.title, new.description);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS tasks_task_fts_delete AFTER DELETE ON tasks_task BEGIN
+        INSERT INTO tasks_task_fts(tasks_task_fts, rowid, title, description) VALUES ('delete', old.id, old.title, old.description);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS tasks_task_fts_update AFTER UPDATE ON tasks_task
+        WHEN old.title IS NOT new.title OR old.description IS NOT new.description BEGIN
+        INSERT INTO tasks_task_fts(tasks_task_fts, rowid, title, description) VALUES ('delete', old.id, old.title, old.description);
+        INSERT INTO tasks_task_fts(rowid, title, description) VALUES (new.id, new.title, new.description);
+    END""",
+    "INSERT INTO tasks_task_fts(tasks_task_fts) VALUES ('rebuild')",
+]
+PG_SETUP = [
+    "CREATE INDEX IF NOT EXISTS tasks_task_search_idx ON tasks_task USING gin "
+    "((to_tsvector('english', coalesce(title, '') || ' ' || coalesce(description, ''))))",
+]
+
+
+# Idempotent, so it can run again after a table rebuild
+def install_search(schema_editor):
+    vendor = schema_editor.connection.vendor
+    for sql in {'sqlite': SQLITE_SETUP, 'postgresql': PG_SETUP}.get(vendor, []):
+        schema_editor.execute(sql)
+
+
+# Adding or removing change_seq rebuilds tasks_task on SQLite, which drops
+# the full-text search triggers
+def reinstall_search(apps, schema_editor):
+    install_search(schema_editor)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0008_task_archive'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TaskTombstone',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('task_id', models.BigIntegerField()),
+                ('change_seq', models.BigIntegerField()),
+                ('deleted_at', models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+        ),
+        migrations.RunPython(migrations.RunPython.noop, reinstall_search),
+        migrations.AddField(
+            model_name='task',
+            name='change_seq',
+            field=models.BigIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(reinstall_search, migrations.RunPython.noop),
+        migrations.AddField(
+            model_name='taskchangestamp',
+            name='sync_floor',
+            field=models.BigIntegerField(default=0),
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(fields=['user', 'change_seq', 'id'], name='task_user_change_seq_idx'),
+        ),
+        migrations.AddField(
+            model_name='tasktombstone',
+            name='user',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='task_tombstones', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddIndex(
+            model_name='tasktombstone',
+            index=models.Index(fields=['user', 'change_seq', 'task_id'], name='tombstone_user_seq_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='tasktombstone',
+            index=models.Index(fields=['deleted_at'], name='tombstone_deleted_at_idx'),
+        ),
+    ]
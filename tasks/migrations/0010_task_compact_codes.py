@@ -0,0 +1,56 @@
+# Generated by Django 5.1.2 on 2026-10-18 12:40
+
+from django.db import migrations, transaction
+from django.db.models import Case, Max, Min, Value, When
+
+import tasks.fields
+
+PRIORITY_CODES = {'Low': 1, 'Medium': 2, 'High': 3}
+STATUS_CODES = {'Pending': 0, 'Completed': 1}
+BATCH_SIZE = 10000
+
+
+# Values outside the choices (such as the '' priority stored for tasks
+# created without one) get the default code instead of NULL, which the
+# NOT NULL columns of 0011 would reject
+def encode(field, codes, default):
+    return Case(*[When(**{field: value}, then=Value(code)) for value, code in codes.items()], default=Value(default))
+
+
+# Online backfill of the new code columns, in id ranges that each commit on
+# their own, so no lock is held for long and the app keeps running.
+# 0011 catches up with rows written meanwhile.
+def backfill(apps, schema_editor):
+    Task = apps.get_model('tasks', 'Task')
+    alias = schema_editor.connection.alias
+    bounds = Task.objects.using(alias).aggregate(low=Min('id'), high=Max('id'))
+    if bounds['low'] is None:
+        return
+    for start in range(bounds['low'] - 1, bounds['high'], BATCH_SIZE):
+        with transaction.atomic(using=alias):
+            Task.objects.using(alias).filter(id__gt=start, id__lte=start + BATCH_SIZE).update(
+                priority_code=encode('priority', PRIORITY_CODES, PRIORITY_CODES['Low']),
+                status_code=encode('status', STATUS_CODES, STATUS_CODES['Pending']),
+            )
+
+
+class Migration(migrations.Migration):
+    atomic = False
+
+    dependencies = [
+        ('tasks', '0009_task_sync'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='task',
+            name='priority_code',
+            field=tasks.fields.CompactChoiceField(choices=[('Low', 'Low'), ('Medium', 'Medium'), ('High', 'High')], codes=PRIORITY_CODES, null=True),
+        ),
+        migrations.AddField(
+            model_name='task',
+            name='status_code',
+            field=tasks.fields.CompactChoiceField(choices=[('Pending', 'Pending'), ('Completed', 'Completed')], codes=STATUS_CODES, null=True),
+        ),
+        migrations.RunPython(backfill, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,132 @@
+# Generated by Django 5.1.2 on 2026-10-18 12:40
+
+from django.db import migrations, models
+from django.db.models import Case, Q, Value, When
+
+import tasks.fields
+
+# The search DDL as of this migration, copied from 0007_task_search so later
+# changes there do not alter what this migration does
+SQLITE_SETUP = [
+    """CREATE VIRTUAL TABLE IF NOT EXISTS tasks_task_fts
+        USING fts5(title, description, content='tasks_task', content_rowid='id')""",
+    """CREATE TRIGGER IF NOT EXISTS tasks_task_fts_insert AFTER INSERT ON tasks_task BEGIN
+        INSERT INTO tasks_task_fts(rowid, title, description) VALUES (new.id, new.title, new.description);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS tasks_task_fts_delete AFTER DELETE ON tasks_task BEGIN
+        INSERT INTO tasks_task_fts(tasks_task_fts, rowid, title, description) VALUES ('delete', old.id, old.title, old.description);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS tasks_task_fts_update AFTER UPDATE ON tasks_task
+        WHEN old.title IS NOT new.title OR old.description IS NOT new.description BEGIN
+        INSERT INTO tasks_task_fts(tasks_task_fts, rowid, title, description) VALUES ('delete', old.id, old.title, old.description);
+        INSERT INTO tasks_task_fts(rowid, title, description) VALUES (new.id, new.title, new.description);
+    END""",
+    "INSERT INTO tasks_task_fts(tasks_task_fts) VALUES ('rebuild')",
+]
+PG_SETUP = [
+    "CREATE INDEX IF NOT EXISTS tasks_task_search_idx ON tasks_task USING gin "
+    "((to_tsvector('english', coalesce(title, '') || ' ' || coalesce(description, ''))))",
+]
+
+
+# Idempotent, so it can run again after a table rebuild
+def install_search(schema_editor):
+    vendor = schema_editor.connection.vendor
+    for sql in {'sqlite': SQLITE_SETUP, 'postgresql': PG_SETUP}.get(vendor, []):
+        schema_editor.execute(sql)
+
+PRIORITY_CODES = {'Low': 1, 'Medium': 2, 'High': 3}
+STATUS_CODES = {'Pending': 0, 'Completed': 1}
+
+
+# Values outside `mapping` become `default`, as in 0010
+def convert(source, mapping, default):
+    return Case(*[When(**{source: old}, then=Value(new)) for old, new in mapping.items()], default=Value(default))
+
+
+# Encode rows written since the 0010 backfill
+def catch_up(apps, schema_editor):
+    Task = apps.get_model('tasks', 'Task')
+    priority = convert('priority', PRIORITY_CODES, PRIORITY_CODES['Low'])
+    status = convert('status', STATUS_CODES, STATUS_CODES['Pending'])
+    stale = Q(priority_code__isnull=True) | Q(status_code__isnull=True) | ~Q(priority_code=priority) | ~Q(status_code=status)
+    Task.objects.using(schema_editor.connection.alias).filter(stale).update(priority_code=priority, status_code=status)
+
+
+# Reverse: fill the restored string columns from the codes
+def decode(apps, schema_editor):
+    Task = apps.get_model('tasks', 'Task')
+    Task.objects.using(schema_editor.connection.alias).update(
+        priority=convert('priority_code', {code: value for value, code in PRIORITY_CODES.items()}, 'Low'),
+        status=convert('status_code', {code: value for value, code in STATUS_CODES.items()}, 'Pending'),
+    )
+
+
+# Dropping and renaming columns rebuilds tasks_task on SQLite, which drops
+# the full-text search triggers
+def reinstall_search(apps, schema_editor):
+    install_search(schema_editor)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0010_task_compact_codes'),
+    ]
+
+    operations = [
+        migrations.RunPython(migrations.RunPython.noop, reinstall_search),
+        migrations.RunPython(catch_up, migrations.RunPython.noop),
+        migrations.RemoveIndex(model_name='task', name='task_user_status_due_idx'),
+        migrations.RemoveIndex(model_name='task', name='task_user_priority_due_idx'),
+        migrations.RemoveIndex(model_name='task', name='task_user_pending_due_idx'),
+        migrations.RemoveIndex(model_name='task', name='task_completed_at_idx'),
+        # Nullable first, so that unapplying can restore the columns before
+        # decode() fills them
+        migrations.AlterField(
+            model_name='task',
+            name='priority',
+            field=models.CharField(choices=[('Low', 'Low'), ('Medium', 'Medium'), ('High', 'High')], max_length=10, null=True),
+        ),
+        migrations.AlterField(
+            model_name='task',
+            name='status',
+            field=models.CharField(choices=[('Pending', 'Pending'), ('Completed', 'Completed')], default='Pending', max_length=10, null=True),
+        ),
+        migrations.RunPython(migrations.RunPython.noop, decode),
+        migrations.RemoveField(model_name='task', name='priority'),
+        migrations.RemoveField(model_name='task', name='status'),
+        migrations.RenameField(model_name='task', old_name='priority_code', new_name='priority'),
+        migrations.RenameField(model_name='task', old_name='status_code', new_name='status'),
+        migrations.AlterField(
+            model_name='task',
+            name='priority',
+            field=tasks.fields.CompactChoiceField(choices=[('Low', 'Low'), ('Medium', 'Medium'), ('High', 'High')], codes=PRIORITY_CODES),
+        ),
+        migrations.AlterField(
+            model_name='task',
+            name='status',
+            field=tasks.fields.CompactChoiceField(choices=[('Pending', 'Pending'), ('Completed', 'Completed')], codes=STATUS_CODES, default='Pending'),
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(fields=['user', 'status', 'due_date', 'id'], name='task_user_status_due_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(fields=['user', 'priority', 'due_date', 'id'], name='task_user_priority_due_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(fields=['user', '-priority', 'due_date', 'id'], name='task_user_urgent_due_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(condition=models.Q(('status', 'Pending')), fields=['user', 'due_date', 'id'], name='task_user_pending_due_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(condition=models.Q(('status', 'Completed')), fields=['completed_at', 'id'], name='task_completed_at_idx'),
+        ),
+        migrations.RunPython(reinstall_search, migrations.RunPython.noop),
+    ]
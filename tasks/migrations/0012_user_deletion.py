@@ -0,0 +1,30 @@
+# Generated by Django 5.1.2 on 2026-10-18 12:02
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0011_task_compact_codes_swap'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UserDeletion',
+            fields=[
+                ('user_id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('username', models.CharField(max_length=150)),
+                ('requested_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('started_at', models.DateTimeField(blank=True, null=True)),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+                ('tasks_total', models.BigIntegerField(default=0)),
+                ('tasks_deleted', models.BigIntegerField(default=0)),
+                ('other_deleted', models.BigIntegerField(default=0)),
+            ],
+            options={
+                'indexes': [models.Index(condition=models.Q(('finished_at', None)), fields=['requested_at'], name='user_deletion_pending_idx')],
+            },
+        ),
+    ]
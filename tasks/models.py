@@ -3,6 +3,7 @@ from django.core.exceptions import ValidationError
 from django.utils import timezone
 from django.contrib.auth.models import AbstractUser
 from django.conf import settings
+from .fields import CompactChoiceField
 
 # Custom User model
 class User(AbstractUser):
@@ -35,17 +36,48 @@ class Task(models.Model):
         (STATUS_COMPLETED, 'Completed'),
     )
 
+    # Stored codes; priority codes rise with urgency so SQL sorts them right
+    PRIORITY_CODES = {PRIORITY_LOW: 1, PRIORITY_MEDIUM: 2, PRIORITY_HIGH: 3}
+    STATUS_CODES = {STATUS_PENDING: 0, STATUS_COMPLETED: 1}
+
     title = models.CharField(max_length=255)
     description = models.TextField()
     due_date = models.DateField()
-    priority = models.CharField(max_length=10, choices=PRIORITY_LEVELS)
-    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=STATUS_PENDING)
+    priority = CompactChoiceField(choices=PRIORITY_LEVELS, codes=PRIORITY_CODES)
+    status = CompactChoiceField(choices=STATUS_CHOICES, codes=STATUS_CODES, default=STATUS_PENDING)
 
     # Link to custom User model
     user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, null=True, blank=True)
     
     completed_at = models.DateTimeField(null=True, blank=True)  # Field to store completion timestamp
 
+    # Owner's TaskChangeStamp version at this task's last write (tasks/sync.py)
+    change_seq = models.BigIntegerField(default=0, editable=False)
+
+    class Meta:
+        # Every task query filters on user first, then narrows by status,
+        # priority or due date and pages on (due_date, id)
+        indexes = [
+            models.Index(fields=['user', 'due_date', 'id'], name='task_user_due_idx'),
+            models.Index(fields=['user', 'status', 'due_date', 'id'], name='task_user_status_due_idx'),
+            # Also serve ?ordering=priority,due_date and -priority,due_date
+            models.Index(fields=['user', 'priority', 'due_date', 'id'], name='task_user_priority_due_idx'),
+            models.Index(fields=['user', '-priority', 'due_date', 'id'], name='task_user_urgent_due_idx'),
+            models.Index(
+                fields=['user', 'due_date', 'id'],
+                name='task_user_pending_due_idx',
+                condition=models.Q(status='Pending'),
+            ),
+            # Finds archival candidates (tasks/archive.py) without a scan
+            models.Index(
+                fields=['completed_at', 'id'],
+                name='task_completed_at_idx',
+                condition=models.Q(status='Completed'),
+            ),
+            # Delta sync reads a user's tasks in change order
+            models.Index(fields=['user', 'change_seq', 'id'], name='task_user_change_seq_idx'),
+        ]
+
     def clean(self):
         # Validate that the due date is in the future
         if self.due_date < timezone.now().date():
@@ -58,3 +90,116 @@ class Task(models.Model):
     def __str__(self):
         return f"{self.title} ({self.get_priority_display()}) - {self.get_status_display()} - Assigned to: {self.user.username if self.user else 'Unassigned'}"
 
+
+# Per-user change stamp for tasks, bumped by every task write path.
+# Readers compare it against If-None-Match/If-Modified-Since without
+# touching the Task table.
+class TaskChangeStamp(models.Model):
+    user = models.OneToOneField(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, primary_key=True, related_name='task_stamp')
+    version = models.BigIntegerField(default=0)
+    modified_at = models.DateTimeField(null=True, blank=True)
+    # Sync cursors below this version are no longer served, because the
+    # tombstones they would need have been pruned
+    sync_floor = models.BigIntegerField(default=0)
+
+    def __str__(self):
+        return f"{self.user_id} v{self.version}"
+
+# Denormalized per-user task counters, maintained by the task write paths
+# (see tasks/stats.py) so dashboards do not have to count the Task table.
+class TaskStats(models.Model):
+    user = models.OneToOneField(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, primary_key=True, related_name='task_stats')
+    pending = models.BigIntegerField(default=0)
+    completed = models.BigIntegerField(default=0)
+    low = models.BigIntegerField(default=0)
+    medium = models.BigIntegerField(default=0)
+    high = models.BigIntegerField(default=0)
+
+    def __str__(self):
+        return f"{self.user_id}: {self.pending} pending, {self.completed} completed"
+
+# Pending tasks per user and due date, for the overdue / due-this-week totals
+class TaskDueCount(models.Model):
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='task_due_counts')
+    due_date = models.DateField()
+    pending = models.BigIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'due_date'], name='task_due_count_user_date_uniq'),
+        ]
+
+    def __str__(self):
+        return f"{self.user_id} {self.due_date}: {self.pending}"
+
+# Completed tasks moved out of the Task table by tasks/archive.py, so the
+# table the hot filters scan only holds live work. Rows keep their Task id
+# and are read-only.
+class TaskArchive(models.Model):
+    id = models.BigIntegerField(primary_key=True)
+    title = models.CharField(max_length=255)
+    description = models.TextField()
+    due_date = models.DateField()
+    priority = models.CharField(max_length=10, choices=Task.PRIORITY_LEVELS)
+    status = models.CharField(max_length=10, choices=Task.STATUS_CHOICES)
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, null=True, blank=True, related_name='archived_tasks')
+    completed_at = models.DateTimeField()
+    archived_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['user', '-completed_at', '-id'], name='archive_user_completed_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.title} (archived {self.archived_at:%Y-%m-%d})"
+
+# A deleted (or archived) task, kept so delta sync can tell clients to drop
+# it. change_seq is the owner's stamp version of the delete.
+class TaskTombstone(models.Model):
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='task_tombstones')
+    task_id = models.BigIntegerField()
+    change_seq = models.BigIntegerField()
+    deleted_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['user', 'change_seq', 'task_id'], name='tombstone_user_seq_idx'),
+            models.Index(fields=['deleted_at'], name='tombstone_deleted_at_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.user_id} task {self.task_id} deleted at v{self.change_seq}"
+
+# A pending or finished account deletion (tasks/purge.py). The account is
+# deactivated when this is created; the purge worker then deletes its rows
+# in batches and the user last. Outlives the user, so it keeps a plain id.
+class UserDeletion(models.Model):
+    STATUS_PENDING = 'pending'
+    STATUS_RUNNING = 'running'
+    STATUS_DONE = 'done'
+
+    user_id = models.BigIntegerField(primary_key=True)
+    username = models.CharField(max_length=150)
+    requested_at = models.DateTimeField(default=timezone.now)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+    # Live tasks at request time, from the user's TaskStats counters
+    tasks_total = models.BigIntegerField(default=0)
+    tasks_deleted = models.BigIntegerField(default=0)
+    # Archived tasks, tombstones and due counts
+    other_deleted = models.BigIntegerField(default=0)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['requested_at'], condition=models.Q(finished_at=None), name='user_deletion_pending_idx'),
+        ]
+
+    @property
+    def status(self):
+        if self.finished_at is not None:
+            return self.STATUS_DONE
+        return self.STATUS_PENDING if self.started_at is None else self.STATUS_RUNNING
+
+    def __str__(self):
+        return f"{self.username} ({self.status}, {self.tasks_deleted}/{self.tasks_total} tasks)"
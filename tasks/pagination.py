@@ -0,0 +1,173 @@
+import json
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from collections import OrderedDict
+
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+# Keyset (seek) pagination.
+#
+# Rows are ordered by a composite key that must be unique and non-nullable
+# (always end the ordering with 'id'). The cursor carries the key of the
+# last row seen, and the next page is fetched with
+#   WHERE (a > x) OR (a = x AND b > y) ...  ORDER BY a, b LIMIT n
+# so every page costs the same index seek, however deep the client goes.
+class KeysetPagination(BasePagination):
+    page_size = api_settings.PAGE_SIZE or 50
+    page_size_query_param = 'page_size'
+    max_page_size = 500
+    cursor_query_param = 'cursor'
+    invalid_cursor_message = 'Invalid cursor'
+
+    # Used when the view does not declare its own `ordering`
+    ordering = ('id',)
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.prepare(queryset, request, view)
+        rows = list(self.get_page_queryset(queryset))
+        return self.finish(rows)
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        self.prepare(queryset, request, view)
+        rows = [row async for row in self.get_page_queryset(queryset)]
+        return self.finish(rows)
+
+    def prepare(self, queryset, request, view=None):
+        self.request = request
+        self.base_url = request.build_absolute_uri()
+        self.page_size = self.get_page_size(request)
+        self.ordering = self.get_ordering(request, view)
+        self.model = queryset.model
+        self.position, self.reverse = self.decode_cursor(request)
+
+    def get_page_queryset(self, queryset):
+        if self.position is not None:
+            queryset = queryset.filter(self.seek_filter(self.position, self.reverse))
+
+        order_by = [self.flip(field) if self.reverse else field for field in self.ordering]
+        # Fetch one extra row to learn whether there is another page
+        return queryset.order_by(*order_by)[:self.page_size + 1]
+
+    def finish(self, rows):
+        has_more = len(rows) > self.page_size
+        rows = rows[:self.page_size]
+
+        if self.reverse:
+            rows.reverse()
+            self.has_next = self.position is not None
+            self.has_previous = has_more
+        else:
+            self.has_next = has_more
+            self.has_previous = self.position is not None
+
+        self.page = rows
+        return rows
+
+    def get_paginated_response(self, data):
+        return Response(OrderedDict([
+            ('next', self.get_next_link()),
+            ('previous', self.get_previous_link()),
+            ('results', data),
+        ]))
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'required': ['results'],
+            'properties': {
+                'next': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'previous': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'results': schema,
+            },
+        }
+
+    def get_page_size(self, request):
+        try:
+            size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        return max(1, min(size, self.max_page_size))
+
+    def get_ordering(self, request, view):
+        ordering = getattr(view, 'ordering', None) or self.ordering
+        if isinstance(ordering, str):
+            ordering = (ordering,)
+        return tuple(ordering)
+
+    def get_next_link(self):
+        if not self.has_next or not self.page:
+            return None
+        return self.encode_cursor(self.page[-1], reverse=False)
+
+    def get_previous_link(self):
+        if not self.has_previous:
+            return None
+        if not self.page:
+            return remove_query_param(self.base_url, self.cursor_query_param)
+        return self.encode_cursor(self.page[0], reverse=True)
+
+    # Build the "row comes after `position`" predicate for the ordering
+    def seek_filter(self, position, reverse):
+        condition = Q()
+        equal = Q()
+        for field, value in zip(self.ordering, position):
+            name = field.lstrip('-')
+            descending = field.startswith('-') != reverse
+            lookup = 'lt' if descending else 'gt'
+            condition |= equal & Q(**{f'{name}__{lookup}': value})
+            equal &= Q(**{name: value})
+        return condition
+
+    @staticmethod
+    def flip(field):
+        return field[1:] if field.startswith('-') else f'-{field}'
+
+    def get_value(self, row, name):
+        if isinstance(row, dict):
+            value = row[name]
+        else:
+            value = getattr(row, 'pk' if name == 'id' else name)
+        field = self.model._meta.get_field(name)
+        return field.value_to_string(_Value(field.attname, value))
+
+    def encode_cursor(self, row, reverse):
+        payload = {'p': [self.get_value(row, field.lstrip('-')) for field in self.ordering]}
+        if reverse:
+            payload['r'] = 1
+        token = urlsafe_b64encode(json.dumps(payload, separators=(',', ':')).encode()).decode()
+        return replace_query_param(self.base_url, self.cursor_query_param, token)
+
+    def decode_cursor(self, request):
+        token = request.query_params.get(self.cursor_query_param)
+        if not token:
+            return None, False
+
+        try:
+            payload = json.loads(urlsafe_b64decode(token.encode()).decode())
+            raw = payload['p']
+            if len(raw) != len(self.ordering):
+                raise ValueError
+            position = [
+                self.model._meta.get_field(field.lstrip('-')).to_python(value)
+                for field, value in zip(self.ordering, raw)
+            ]
+        except Exception:
+            raise NotFound(self.invalid_cursor_message)
+
+        return position, bool(payload.get('r'))
+
+
+# Archived tasks, newest completion first
+class ArchivePagination(KeysetPagination):
+    ordering = ('-completed_at', '-id')
+
+
+# Minimal stand-in so Field.value_to_string() can format plain values too
+class _Value:
+    def __init__(self, attname, value):
+        setattr(self, attname, value)
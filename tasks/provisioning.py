@@ -0,0 +1,171 @@
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+import django
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+from django.db import transaction
+from rest_framework.exceptions import ValidationError
+
+from .models import User
+from .serializers import UserProvisionSerializer
+
+# Bulk user provisioning.
+#
+# Password hashing (PBKDF2 by default) is the cost of creating a user, so
+# a batch hashes its passwords in parallel on a process pool and then
+# inserts every user with one bulk_create. Uniqueness is left to the
+# database: the insert skips conflicting rows and a read-back of the batch
+# tells which rows were created and which clashed on username or email.
+
+USERNAME_TAKEN = 'This username is already taken.'
+EMAIL_TAKEN = 'This email is already registered.'
+
+_pool = None
+_pool_pid = None
+_pool_lock = threading.Lock()
+
+
+def get_hash_workers():
+    return getattr(settings, 'PASSWORD_HASH_WORKERS', None) or os.cpu_count() or 1
+
+
+# Worker processes are spawned rather than forked, which is safe inside a
+# threaded server; each one sets Django up once
+def get_pool():
+    global _pool, _pool_pid
+    if _pool_pid != os.getpid():
+        with _pool_lock:
+            if _pool_pid != os.getpid():
+                _pool = ProcessPoolExecutor(
+                    max_workers=get_hash_workers(),
+                    mp_context=multiprocessing.get_context('spawn'),
+                    initializer=django.setup,
+                )
+                _pool_pid = os.getpid()
+    return _pool
+
+
+# Drop a pool that lost a worker; a broken pool fails every later call, so
+# the next get_pool() builds a new one
+def discard_pool(pool):
+    global _pool, _pool_pid
+    with _pool_lock:
+        if _pool is pool:
+            _pool, _pool_pid = None, None
+    pool.shutdown(wait=False, cancel_futures=True)
+
+
+# Hash `passwords` in order; small inputs are not worth the round trip.
+# If a worker dies the batch is hashed once more on a fresh pool.
+def hash_passwords(passwords):
+    passwords = list(passwords)
+    workers = get_hash_workers()
+    if workers < 2 or len(passwords) < 2:
+        return [make_password(password) for password in passwords]
+    chunksize = max(1, len(passwords) // (workers * 4))
+    for attempt in range(2):
+        pool = get_pool()
+        try:
+            return list(pool.map(make_password, passwords, chunksize=chunksize))
+        except BrokenProcessPool:
+            discard_pool(pool)
+            if attempt:
+                raise
+
+
+class UserProvisioner:
+    def __init__(self, batch_size=500, max_errors=100, on_batch=None):
+        self.batch_size = batch_size
+        self.max_errors = max_errors
+        self.on_batch = on_batch
+        self.rows = 0
+        self.created = []
+        self.failed = 0
+        self.errors = []
+        self.pending = []  # (row number, validated data)
+        self.serializer = UserProvisionSerializer()
+
+    # `rows` yields (row number, row dict or None, error) like
+    # tasks.importer.iter_rows
+    def run(self, rows):
+        start = time.perf_counter()
+        for row_num, row, error in rows:
+            self.rows += 1
+            if error is None:
+                try:
+                    self.pending.append((row_num, self.serializer.run_validation(row)))
+                except ValidationError as exc:
+                    error = exc.detail if isinstance(exc.detail, dict) else {'non_field_errors': exc.detail}
+                else:
+                    if len(self.pending) >= self.batch_size:
+                        self.flush()
+                    continue
+            self.add_error(row_num, error)
+        self.flush()
+        return self.summary(time.perf_counter() - start)
+
+    def add_error(self, row_num, error):
+        self.failed += 1
+        if len(self.errors) < self.max_errors:
+            self.errors.append({'row': row_num, 'errors': error})
+
+    def flush(self):
+        if not self.pending:
+            return
+        batch, self.pending = self.pending, []
+
+        # Rows repeating a username or email of an earlier row in the batch
+        seen_usernames, seen_emails, unique = set(), set(), []
+        for row_num, data in batch:
+            if data['username'] in seen_usernames:
+                self.add_error(row_num, {'username': [USERNAME_TAKEN]})
+            elif data['email'] in seen_emails:
+                self.add_error(row_num, {'email': [EMAIL_TAKEN]})
+            else:
+                seen_usernames.add(data['username'])
+                seen_emails.add(data['email'])
+                unique.append((row_num, data))
+
+        hashes = hash_passwords(data['password'] for _, data in unique)
+        users = [
+            User(username=data['username'], email=data['email'], bio=data.get('bio', ''), password=encoded)
+            for (_, data), encoded in zip(unique, hashes)
+        ]
+        with transaction.atomic():
+            User.objects.bulk_create(users, ignore_conflicts=True)
+            stored = {
+                username: (pk, password)
+                for username, pk, password in User.objects.filter(
+                    username__in=[user.username for user in users]
+                ).values_list('username', 'id', 'password')
+            }
+
+        # Salted hashes are unique, so a matching hash means this row was inserted
+        for (row_num, _), user in zip(unique, users):
+            pk, password = stored.get(user.username, (None, None))
+            if password == user.password:
+                self.created.append({'row': row_num, 'id': pk, 'username': user.username})
+            elif pk is not None:
+                self.add_error(row_num, {'username': [USERNAME_TAKEN]})
+            else:
+                self.add_error(row_num, {'email': [EMAIL_TAKEN]})
+
+        if self.on_batch:
+            self.on_batch(self)
+
+    def summary(self, seconds):
+        return {
+            'rows': self.rows,
+            'created': len(self.created),
+            'failed': self.failed,
+            'users': self.created,
+            'errors': self.errors,
+            'errors_truncated': self.failed > len(self.errors),
+            'seconds': round(seconds, 3),
+            'users_per_second': round(len(self.created) / seconds, 1) if seconds else None,
+        }
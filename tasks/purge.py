@@ -0,0 +1,88 @@
+from django.db import connection, transaction
+from django.utils import timezone
+
+from .authentication import invalidate_cached_user
+from .models import Task, TaskArchive, TaskDueCount, TaskStats, TaskTombstone, User, UserDeletion
+
+# Account deletion in the background.
+#
+# Deleting a user straight away cascades to every one of their tasks in a
+# single transaction, which for a large account holds locks and grows the
+# WAL for as long as it takes. Instead the request only deactivates the
+# account and queues a UserDeletion; the purge_users worker then deletes
+# the user's rows a batch at a time, each batch in its own short
+# transaction together with the progress counters, and the user row last,
+# once only its one-row tables are left to cascade to. A worker that dies
+# loses at most the batch it was in, and the next run picks the deletion
+# up where it stopped. No change bookkeeping is kept for these rows: the
+# stamp and counters they would update are deleted with the user.
+
+PURGED_MODELS = (Task, TaskArchive, TaskTombstone, TaskDueCount)
+
+
+# Deactivate `user` and queue the deletion of their data. Asking again
+# returns the deletion already queued.
+@transaction.atomic
+def request_user_deletion(user):
+    User.objects.filter(pk=user.pk).update(is_active=False)
+    user.is_active = False
+    invalidate_cached_user(user)
+    counts = TaskStats.objects.filter(user=user).values_list('pending', 'completed').first() or (0, 0)
+    deletion, _ = UserDeletion.objects.get_or_create(
+        user_id=user.pk,
+        defaults={'username': user.username, 'tasks_total': sum(counts)},
+    )
+    return deletion
+
+
+# Delete up to `batch_size` rows of one queued deletion, or the user when
+# nothing else is left. Returns (deletion, rows deleted); the deletion is
+# None when it is finished or another worker holds it.
+@transaction.atomic
+def purge_batch(user_id, batch_size):
+    deletions = UserDeletion.objects.filter(user_id=user_id, finished_at=None)
+    if connection.features.has_select_for_update_skip_locked:
+        deletions = deletions.select_for_update(skip_locked=True)
+    else:
+        deletions = deletions.select_for_update()
+    deletion = deletions.first()
+    if deletion is None:
+        return None, 0
+    if deletion.started_at is None:
+        deletion.started_at = timezone.now()
+
+    for model in PURGED_MODELS:
+        ids = list(model.objects.filter(user_id=user_id).values_list('pk', flat=True)[:batch_size])
+        if ids:
+            count, _ = model.objects.filter(pk__in=ids).delete()
+            if model is Task:
+                deletion.tasks_deleted += count
+            else:
+                deletion.other_deleted += count
+            deletion.save(update_fields=['started_at', 'tasks_deleted', 'other_deleted'])
+            return deletion, count
+
+    # Also catches anything written through a cached login meanwhile
+    User.objects.filter(pk=user_id).delete()
+    deletion.finished_at = timezone.now()
+    deletion.save(update_fields=['started_at', 'finished_at'])
+    return deletion, 0
+
+
+# Yield (deletion, rows deleted) per batch, oldest request first, until no
+# deletion is left that this worker can take
+def purge_users(batch_size=1000):
+    skipped = set()
+    while True:
+        pending = UserDeletion.objects.filter(finished_at=None).exclude(user_id__in=skipped)
+        user_id = pending.order_by('requested_at').values_list('user_id', flat=True).first()
+        if user_id is None:
+            return
+        while True:
+            deletion, count = purge_batch(user_id, batch_size)
+            if deletion is None:
+                skipped.add(user_id)  # Another worker is on it
+                break
+            yield deletion, count
+            if deletion.finished_at is not None:
+                break
@@ -0,0 +1,143 @@
+import random
+import time
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.functional import SimpleLazyObject, empty
+
+# Read-replica routing.
+#
+# ReplicaRoutingMiddleware picks one of REPLICA_DATABASES for each GET/HEAD
+# request and ReplicaRouter sends that request's reads there, but only
+# from the task and user read endpoints below. Everything else, and every
+# write, uses the primary ("default").
+#
+# Read-your-writes: once a request writes, the rest of it reads from the
+# primary, and so do that user's requests for READ_YOUR_WRITES_SECONDS.
+# The window is kept per user in the cache (shared across workers when
+# the cache is) and in a cookie for clients that keep cookies.
+
+READ_VIEWS = frozenset({
+    'api-root', 'user-list', 'user-detail', 'task-list', 'task-detail', 'task-stats', 'task-search',
+    'task-export', 'task-changes', 'task-archive-list', 'task-archive-detail', 'async-task-list', 'async-task-detail',
+})
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+STICKY_COOKIE = 'db_primary_until'
+
+_state = ContextVar('db_routing_state', default=None)
+
+
+def get_replicas():
+    return [alias for alias in getattr(settings, 'REPLICA_DATABASES', ()) if alias in settings.DATABASES]
+
+
+def get_sticky_seconds():
+    return getattr(settings, 'READ_YOUR_WRITES_SECONDS', 5)
+
+
+def sticky_key(user_id):
+    return f'db:primary:{user_id}'
+
+
+# The request's user id if authentication already ran; never triggers it
+def resolved_user_id(request):
+    user = request.__dict__.get('user')
+    if type(user) is SimpleLazyObject:
+        user = user._wrapped
+        if user is empty:
+            return None
+    if user is None or not getattr(user, 'is_authenticated', False):
+        return None
+    return user.pk
+
+
+class RoutingState:
+    def __init__(self, request, replica):
+        self.request = request
+        self.replica = replica  # None once this request must read from the primary
+        self.wrote = False
+        self.checked_user = None
+
+
+class ReplicaRouter:
+    def db_for_read(self, model, **hints):
+        state = _state.get()
+        if state is None or state.replica is None:
+            return None
+        match = state.request.resolver_match
+        if match is None or match.url_name not in READ_VIEWS:
+            return None
+
+        user_id = resolved_user_id(state.request)
+        if user_id is not None and user_id != state.checked_user:
+            state.checked_user = user_id
+            if cache.get(sticky_key(user_id)):
+                state.replica = None
+                return None
+        return state.replica
+
+    def db_for_write(self, model, **hints):
+        state = _state.get()
+        if state is not None:
+            state.wrote = True
+            state.replica = None
+        return None
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Replicas hold the same data as the primary
+        return True
+
+
+class ReplicaRoutingMiddleware:
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        state = self.start(request)
+        token = _state.set(state)
+        try:
+            response = self.get_response(request)
+        finally:
+            _state.reset(token)
+        return self.finish(request, response, state)
+
+    async def __acall__(self, request):
+        state = self.start(request)
+        token = _state.set(state)
+        try:
+            response = await self.get_response(request)
+        finally:
+            _state.reset(token)
+        return self.finish(request, response, state)
+
+    def start(self, request):
+        replicas = get_replicas()
+        if not replicas or request.method not in SAFE_METHODS or self.is_sticky(request):
+            return RoutingState(request, None)
+        return RoutingState(request, random.choice(replicas))
+
+    @staticmethod
+    def is_sticky(request):
+        try:
+            return float(request.COOKIES.get(STICKY_COOKIE, 0)) > time.time()
+        except ValueError:
+            return False
+
+    def finish(self, request, response, state):
+        if state.wrote and get_replicas():
+            seconds = get_sticky_seconds()
+            user_id = resolved_user_id(request)
+            if user_id is not None:
+                cache.set(sticky_key(user_id), True, seconds)
+            response.set_cookie(STICKY_COOKIE, str(int(time.time() + seconds)), max_age=seconds, httponly=True, samesite='Lax')
+        return response
@@ -0,0 +1,64 @@
+import re
+
+from django.db import connection
+
+from .models import Task
+
+# Full-text search over Task.title and Task.description.
+#
+# SQLite: an external-content FTS5 table (tasks_task_fts) kept in sync with
+# tasks_task by triggers, ranked with bm25().
+# Postgres: a GIN index on a tsvector expression, ranked with ts_rank().
+# Both are created by migration 0007_task_search (and recreated by the
+# migrations that rebuild tasks_task on SQLite).
+# The query below repeats the indexed expression verbatim so the planner
+# can use the index.
+
+FTS_TABLE = 'tasks_task_fts'
+PG_VECTOR = "to_tsvector('english', coalesce(title, '') || ' ' || coalesce(description, ''))"
+
+# Title matches weigh twice as much as description matches
+SQLITE_RANK = f'bm25({FTS_TABLE}, 2.0, 1.0)'
+
+
+# Turn free text into an FTS5 query: every word must match, the last one as
+# a prefix so results follow the user while typing. Quoting each word keeps
+# FTS5 operators in user input from being interpreted.
+def to_fts5_query(text):
+    words = re.findall(r'\w+', text)
+    if not words:
+        return None
+    quoted = ['"{}"'.format(word.replace('"', '""')) for word in words]
+    quoted[-1] += '*'
+    return ' '.join(quoted)
+
+
+# Ids of the user's tasks matching `text`, best match first
+def search_task_ids(user, text, limit, offset=0):
+    vendor = connection.vendor
+
+    if vendor == 'sqlite':
+        query = to_fts5_query(text)
+        if query is None:
+            return []
+        sql = f"""
+            SELECT t.id FROM {FTS_TABLE} JOIN tasks_task t ON t.id = {FTS_TABLE}.rowid
+            WHERE {FTS_TABLE} MATCH %s AND t.user_id = %s
+            ORDER BY {SQLITE_RANK}, t.id LIMIT %s OFFSET %s
+        """
+        params = [query, user.pk, limit, offset]
+    elif vendor == 'postgresql':
+        sql = f"""
+            SELECT id FROM tasks_task, websearch_to_tsquery('english', %s) q
+            WHERE user_id = %s AND {PG_VECTOR} @@ q
+            ORDER BY ts_rank({PG_VECTOR}, q) DESC, id LIMIT %s OFFSET %s
+        """
+        params = [text, user.pk, limit, offset]
+    else:
+        # No full-text support: unindexed substring match
+        tasks = Task.objects.filter(user=user, title__icontains=text) | Task.objects.filter(user=user, description__icontains=text)
+        return list(tasks.order_by('id').values_list('id', flat=True)[offset:offset + limit])
+
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        return [row[0] for row in cursor.fetchall()]
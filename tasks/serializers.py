@@ -1,13 +1,36 @@
+from django.contrib.auth.validators import UnicodeUsernameValidator
 from django.utils import timezone
-from rest_framework import serializers
-from .models import Task, User  # Import your custom User model
+from rest_framework import ISO_8601, serializers
+from rest_framework.exceptions import ParseError
+from rest_framework.relations import RelatedField
+from rest_framework.settings import api_settings
+from .models import Task, TaskArchive, User, UserDeletion  # Import your custom User model
+from .timing import span
+
+# Time .data under the "serialize" Server-Timing span
+class TimedDataMixin:
+    @property
+    def data(self):
+        with span('serialize'):
+            return super().data
+
+class TimedListSerializer(TimedDataMixin, serializers.ListSerializer):
+    pass
 
 # Task Serializer
-class TaskSerializer(serializers.ModelSerializer):
+class TaskSerializer(TimedDataMixin, serializers.ModelSerializer):
     class Meta:
         model = Task
+        list_serializer_class = TimedListSerializer
         fields = '__all__'  # Include all fields; adjust as necessary
 
+    # `fields` limits the output to those names (see get_task_fields)
+    def __init__(self, *args, fields=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        if fields is not None:
+            for name in set(self.fields) - set(fields):
+                self.fields.pop(name)
+
     # Custom validation to ensure the due date is in the future
     def validate_due_date(self, value):
         if value < timezone.now().date():
@@ -22,10 +45,110 @@ class TaskSerializer(serializers.ModelSerializer):
             raise serializers.ValidationError("Non-completed tasks should not have a completion timestamp (completed_at).")
         return data
 
+# Archived tasks are read-only
+class TaskArchiveSerializer(TimedDataMixin, serializers.ModelSerializer):
+    class Meta:
+        model = TaskArchive
+        fields = '__all__'
+        read_only_fields = [field.name for field in TaskArchive._meta.fields]
+        list_serializer_class = TimedListSerializer
+
+# Progress of a queued account deletion (tasks/purge.py)
+class UserDeletionSerializer(serializers.ModelSerializer):
+    status = serializers.CharField(read_only=True)
+
+    class Meta:
+        model = UserDeletion
+        fields = ['user_id', 'username', 'status', 'requested_at', 'started_at', 'finished_at',
+                  'tasks_total', 'tasks_deleted', 'other_deleted']
+        read_only_fields = fields
+
+# Read-only fast path for task lists and exports.
+# Produces exactly what TaskSerializer(many=True).data would, but from
+# values()/values_list() rows, so no Task instances are built and the
+# common field types skip DRF's per-field to_representation.
+class TaskRowSerializer:
+    def __init__(self, fields=None):
+        declared = TaskSerializer().fields
+        self.names = list(fields or declared)
+        self.converters = [self.get_converter(declared[name]) for name in self.names]
+
+    @staticmethod
+    def get_converter(field):
+        # None means the raw column value is already the API value
+        if isinstance(field, (RelatedField, serializers.CharField, serializers.ChoiceField, serializers.IntegerField)):
+            return None
+        if isinstance(field, serializers.DateTimeField) \
+                and getattr(field, 'format', api_settings.DATETIME_FORMAT) == ISO_8601:
+            return _datetime_iso
+        if isinstance(field, serializers.DateField) \
+                and getattr(field, 'format', api_settings.DATE_FORMAT) == ISO_8601:
+            return _date_iso
+        return field.to_representation
+
+    # `extra` columns (e.g. a pagination key) are fetched but not output
+    def values(self, queryset, extra=()):
+        extra = [name.lstrip('-') for name in extra]
+        return queryset.values(*self.names, *(name for name in extra if name not in self.names))
+
+    def values_list(self, queryset):
+        return queryset.values_list(*self.names)
+
+    # Convert one values_list() tuple to a list of API values
+    def format(self, row):
+        return [
+            value if value is None or convert is None else convert(value)
+            for convert, value in zip(self.converters, row)
+        ]
+
+    # Convert values() dicts to API dicts
+    def serialize(self, rows):
+        items = list(zip(self.names, self.converters))
+        with span('serialize'):
+            return [
+                {name: row[name] if convert is None or row[name] is None else convert(row[name]) for name, convert in items}
+                for row in rows
+            ]
+
+# Sparse fieldsets for task reads: ?fields=title,status keeps only those
+# fields and ?exclude=description drops some. Returns the field names in
+# declaration order, always with 'id', or None when neither is given.
+def get_task_fields(params):
+    requested = params.get('fields')
+    excluded = params.get('exclude')
+    if not requested and not excluded:
+        return None
+
+    declared = list(TaskSerializer().fields)
+    def parse(value):
+        names = [name.strip() for name in (value or '').split(',') if name.strip()]
+        unknown = [name for name in names if name not in declared]
+        if unknown:
+            raise ParseError(f"Unknown task field(s): {', '.join(unknown)}")
+        return set(names)
+
+    keep = parse(requested) or set(declared)
+    keep -= parse(excluded)
+    keep.add('id')
+    return [name for name in declared if name in keep]
+
+def _date_iso(value):
+    return value.isoformat()
+
+def _datetime_iso(value):
+    # Same as serializers.DateTimeField.to_representation with ISO_8601
+    if timezone.is_aware(value):
+        value = timezone.localtime(value)
+    value = value.isoformat()
+    if value.endswith('+00:00'):
+        value = value[:-6] + 'Z'
+    return value
+
 # User Serializer
-class UserSerializer(serializers.ModelSerializer):
+class UserSerializer(TimedDataMixin, serializers.ModelSerializer):
     class Meta:
         model = User
+        list_serializer_class = TimedListSerializer
         fields = ['id', 'username', 'email', 'password', 'bio', 'profile_picture']  # Specify fields explicitly
         extra_kwargs = {
             'password': {'write_only': True},  # Make password write-only
@@ -63,3 +186,16 @@ class UserSerializer(serializers.ModelSerializer):
         if User.objects.filter(email=value).exists():
             raise serializers.ValidationError("This email is already registered.")
         return value
+
+# Validates bulk-provisioned users (tasks/provisioning.py) without the
+# per-row uniqueness queries; the unique constraints on username and email
+# catch conflicts when the batch is inserted
+class UserProvisionSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = User
+        fields = ['username', 'email', 'password', 'bio']
+        extra_kwargs = {
+            'username': {'validators': [UnicodeUsernameValidator()]},
+            'email': {'validators': []},
+            'password': {'write_only': True},
+        }
@@ -0,0 +1,125 @@
+from collections import Counter, defaultdict
+from datetime import timedelta
+
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Q, Sum
+from django.utils import timezone
+
+from .models import Task, TaskDueCount, TaskStats
+
+STATUS_COLUMNS = {
+    Task.STATUS_PENDING: 'pending',
+    Task.STATUS_COMPLETED: 'completed',
+}
+PRIORITY_COLUMNS = {
+    Task.PRIORITY_LOW: 'low',
+    Task.PRIORITY_MEDIUM: 'medium',
+    Task.PRIORITY_HIGH: 'high',
+}
+
+
+# Counter deltas for replacing the `before` task states with the `after`
+# ones. States are anything with status, priority and due_date (Task
+# instances or copies taken before a write).
+def compute_deltas(before=(), after=()):
+    columns = Counter()
+    due = Counter()
+    for sign, states in ((-1, before), (1, after)):
+        for state in states:
+            columns[STATUS_COLUMNS[state.status]] += sign
+            columns[PRIORITY_COLUMNS[state.priority]] += sign
+            if state.status == Task.STATUS_PENDING:
+                due[state.due_date] += sign
+    return {k: v for k, v in columns.items() if v}, {k: v for k, v in due.items() if v}
+
+
+def _update_or_create(queryset, update, create):
+    if queryset.update(**update):
+        return
+    try:
+        with transaction.atomic():
+            create()
+    except IntegrityError:
+        queryset.update(**update)
+
+
+# Apply the counter changes for one user with a constant number of
+# queries. Must run in the transaction that writes the tasks, after the
+# user's change stamp has been bumped: that row lock serializes writers
+# for the same user, so the read-modify-write below cannot interleave.
+# The before states must come from task rows locked in the same
+# transaction (select_for_update), or two writers can both count the same
+# old state.
+def apply_deltas(user_id, before=(), after=()):
+    columns, due = compute_deltas(before, after)
+
+    if columns:
+        _update_or_create(
+            TaskStats.objects.filter(user_id=user_id),
+            {name: F(name) + delta for name, delta in columns.items()},
+            lambda: TaskStats.objects.create(user_id=user_id, **columns),
+        )
+
+    if due:
+        rows = {row.due_date: row for row in TaskDueCount.objects.filter(user_id=user_id, due_date__in=list(due))}
+        for row in rows.values():
+            row.pending += due[row.due_date]
+        TaskDueCount.objects.bulk_update([row for row in rows.values() if row.pending > 0], ['pending'])
+        TaskDueCount.objects.filter(pk__in=[row.pk for row in rows.values() if row.pending <= 0]).delete()
+        TaskDueCount.objects.bulk_create([
+            TaskDueCount(user_id=user_id, due_date=due_date, pending=delta)
+            for due_date, delta in due.items() if due_date not in rows and delta > 0
+        ])
+
+
+# Read the counters: one primary-key lookup plus one indexed range sum over
+# the user's pending-per-due-date rows
+def get_stats(user, today=None):
+    today = today or timezone.now().date()
+    week_end = today + timedelta(days=6 - today.weekday())
+
+    counters = TaskStats.objects.filter(user=user).first() or TaskStats(user=user)
+    due = TaskDueCount.objects.filter(user=user, due_date__lte=week_end).aggregate(
+        overdue=Sum('pending', filter=Q(due_date__lt=today)),
+        due_this_week=Sum('pending', filter=Q(due_date__gte=today)),
+    )
+
+    return {
+        'total': counters.pending + counters.completed,
+        'by_status': {status: getattr(counters, column) for status, column in STATUS_COLUMNS.items()},
+        'by_priority': {priority: getattr(counters, column) for priority, column in PRIORITY_COLUMNS.items()},
+        'overdue': due['overdue'] or 0,
+        'due_this_week': due['due_this_week'] or 0,
+    }
+
+
+# Recompute the counters from the Task table with a single grouped
+# aggregate query. Limited to `user_ids` when given.
+@transaction.atomic
+def rebuild_stats(user_ids=None):
+    tasks = Task.objects.exclude(user=None)
+    stats = TaskStats.objects.all()
+    due_counts = TaskDueCount.objects.all()
+    if user_ids is not None:
+        tasks = tasks.filter(user__in=user_ids)
+        stats = stats.filter(user__in=user_ids)
+        due_counts = due_counts.filter(user__in=user_ids)
+
+    totals = defaultdict(Counter)
+    pending_by_date = Counter()
+    for row in tasks.values('user', 'status', 'priority', 'due_date').annotate(n=Count('id')).order_by():
+        totals[row['user']][STATUS_COLUMNS[row['status']]] += row['n']
+        totals[row['user']][PRIORITY_COLUMNS[row['priority']]] += row['n']
+        if row['status'] == Task.STATUS_PENDING:
+            pending_by_date[row['user'], row['due_date']] += row['n']
+
+    stats.delete()
+    due_counts.delete()
+    TaskStats.objects.bulk_create(
+        [TaskStats(user_id=user_id, **columns) for user_id, columns in totals.items()], batch_size=1000,
+    )
+    TaskDueCount.objects.bulk_create(
+        [TaskDueCount(user_id=user_id, due_date=due_date, pending=n) for (user_id, due_date), n in pending_by_date.items()],
+        batch_size=1000,
+    )
+    return len(totals)
@@ -0,0 +1,109 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Max, Q
+from django.utils import timezone
+from rest_framework.exceptions import ParseError
+
+from .models import Task, TaskChangeStamp, TaskTombstone
+
+# Delta sync for offline clients.
+#
+# Every task write stores the owner's new TaskChangeStamp version in the
+# task's change_seq, and every delete leaves a TaskTombstone with that
+# version (tasks/changes.py). Writers of one user serialize on the stamp
+# row, so versions commit in order and a client that remembers the last
+# position it has seen only needs the rows and tombstones after it, read
+# in (change_seq, id) order from the per-user indexes.
+#
+# A cursor is "<seq>" (everything up to version seq) or "<seq>.<id>" (a
+# batch cut inside version seq, after task id). No cursor starts a full
+# sync of the live tasks. Tombstones older than TASK_TOMBSTONE_DAYS are
+# pruned; cursors from before that are answered with 410 Gone and the
+# client starts over.
+
+DEFAULT_BATCH_SIZE = 500
+MAX_BATCH_SIZE = 1000
+
+
+class CursorExpired(Exception):
+    pass
+
+
+def parse_cursor(value):
+    if not value:
+        return -1, None
+    try:
+        seq, _, pk = value.partition('.')
+        seq, pk = int(seq), int(pk) if pk else None
+    except ValueError:
+        raise ParseError('Invalid sync cursor')
+    if seq < 0:
+        raise ParseError('Invalid sync cursor')
+    return seq, pk
+
+
+def format_cursor(seq, pk=None):
+    return str(seq) if pk is None else f'{seq}.{pk}'
+
+
+def after_position(seq, pk, id_field):
+    if pk is None:
+        return Q(change_seq__gt=seq)
+    return Q(change_seq__gt=seq) | Q(change_seq=seq, **{f'{id_field}__gt': pk})
+
+
+# Changes to `user`'s tasks after `cursor`, at most `limit` of them.
+# `rows` is a TaskRowSerializer. Returns the response body; raises
+# CursorExpired for cursors older than the pruned tombstones.
+def get_changes(user, cursor, limit, rows):
+    seq, pk = parse_cursor(cursor)
+    version, floor = TaskChangeStamp.objects.filter(user=user).values_list('version', 'sync_floor').first() or (0, 0)
+    if seq >= 0 and (seq < floor or (seq == floor and pk is not None)):
+        raise CursorExpired
+    if pk is None and seq >= version:
+        return {'changes': [], 'deleted': [], 'cursor': format_cursor(max(seq, 0)), 'has_more': False}
+
+    # Versions above the stamp read here may not have committed in full yet
+    tasks = Task.objects.filter(after_position(seq, pk, 'id'), user=user, change_seq__lte=version)
+    changed = list(rows.values(tasks, extra=('change_seq', 'id')).order_by('change_seq', 'id')[:limit + 1])
+    deleted = []
+    if seq >= 0:
+        # A full sync has nothing to delete on the client
+        tombstones = TaskTombstone.objects.filter(after_position(seq, pk, 'task_id'), user=user, change_seq__lte=version)
+        deleted = list(tombstones.order_by('change_seq', 'task_id').values_list('change_seq', 'task_id')[:limit + 1])
+
+    # Merge both streams in (change_seq, id) order and cut the batch
+    merged = sorted(
+        [((row['change_seq'], row['id']), row) for row in changed] + [(key, None) for key in deleted],
+        key=lambda item: item[0],
+    )
+    has_more = len(merged) > limit
+    merged = merged[:limit]
+    live = [row for _, row in merged if row is not None]
+    live_ids = {row['id'] for row in live}
+    return {
+        'changes': rows.serialize(live),
+        # A task deleted and then restored in the same batch is just live
+        'deleted': [key[1] for key, row in merged if row is None and key[1] not in live_ids],
+        'cursor': format_cursor(*merged[-1][0]) if has_more else format_cursor(version),
+        'has_more': has_more,
+    }
+
+
+def get_tombstone_cutoff(days=None):
+    if days is None:
+        days = settings.TASK_TOMBSTONE_DAYS
+    return timezone.now() - timedelta(days=days)
+
+
+# Delete tombstones older than `cutoff`, raising each affected user's
+# sync_floor past them. Returns the number deleted.
+@transaction.atomic
+def prune_tombstones(cutoff):
+    old = TaskTombstone.objects.filter(deleted_at__lt=cutoff)
+    for user_id, seq in old.values('user').annotate(seq=Max('change_seq')).values_list('user', 'seq'):
+        TaskChangeStamp.objects.filter(user_id=user_id, sync_floor__lt=seq).update(sync_floor=seq)
+    deleted, _ = old.delete()
+    return deleted
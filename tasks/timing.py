@@ -0,0 +1,144 @@
+import json
+import logging
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+
+# Per-request instrumentation: SQL query count and time, time spent in
+# named spans (serializers, authentication) and total time, reported in a
+# Server-Timing header and, past the SLOW_REQUEST_* thresholds, in the
+# "tasks.slow_requests" log.
+#
+# The metrics of the current request live in a context variable, which
+# follows the request into sync_to_async threads. A database execute
+# wrapper, installed once per connection, adds each query to it, so the
+# cost per query is a context lookup, two clock reads and a counter bump.
+# Queries run while a streamed response is consumed are not included.
+
+logger = logging.getLogger('tasks.slow_requests')
+
+_current = ContextVar('request_metrics', default=None)
+
+
+class RequestMetrics:
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.queries = 0
+        self.sql_time = 0.0
+        self.statements = Counter()
+        self.spans = Counter()
+        self.depth = Counter()
+
+    # The most repeated statements beyond `limit` runs, e.g. an N+1 loop
+    def duplicates(self, limit):
+        return [(sql, count) for sql, count in self.statements.most_common(3) if count > limit]
+
+
+def current_metrics():
+    return _current.get()
+
+
+# Time a block of work under `name`. Nested spans of the same name (a
+# serializer rendering another one) are only counted once.
+@contextmanager
+def span(name):
+    metrics = _current.get()
+    if metrics is None:
+        yield
+        return
+
+    metrics.depth[name] += 1
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        metrics.depth[name] -= 1
+        if not metrics.depth[name]:
+            metrics.spans[name] += time.perf_counter() - start
+
+
+def record_queries(execute, sql, params, many, context):
+    metrics = _current.get()
+    if metrics is None:
+        return execute(sql, params, many, context)
+
+    start = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        metrics.sql_time += time.perf_counter() - start
+        metrics.queries += 1
+        metrics.statements[sql] += 1
+
+
+# connection_created receiver; the wrapper list outlives reconnects
+def install_query_recorder(sender, connection, **kwargs):
+    if record_queries not in connection.execute_wrappers:
+        connection.execute_wrappers.append(record_queries)
+
+
+def get_thresholds():
+    return (
+        getattr(settings, 'SLOW_REQUEST_MS', 500),
+        getattr(settings, 'SLOW_REQUEST_QUERIES', 50),
+        getattr(settings, 'DUPLICATE_QUERY_LIMIT', 5),
+    )
+
+
+class RequestTimingMiddleware:
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        metrics = request.timing = RequestMetrics()
+        token = _current.set(metrics)
+        try:
+            response = self.get_response(request)
+        finally:
+            _current.reset(token)
+        return self.finish(request, response, metrics)
+
+    async def __acall__(self, request):
+        metrics = request.timing = RequestMetrics()
+        token = _current.set(metrics)
+        try:
+            response = await self.get_response(request)
+        finally:
+            _current.reset(token)
+        return self.finish(request, response, metrics)
+
+    def finish(self, request, response, metrics):
+        total = (time.perf_counter() - metrics.start) * 1000
+        timings = [f'db;dur={metrics.sql_time * 1000:.1f};desc="{metrics.queries} queries"']
+        timings += [f'{name};dur={seconds * 1000:.1f}' for name, seconds in metrics.spans.items()]
+        timings.append(f'total;dur={total:.1f}')
+        response['Server-Timing'] = ', '.join(timings)
+
+        slow_ms, max_queries, duplicate_limit = get_thresholds()
+        duplicates = metrics.duplicates(duplicate_limit)
+        if total >= slow_ms or metrics.queries >= max_queries or duplicates:
+            match = getattr(request, 'resolver_match', None)
+            logger.warning(json.dumps({
+                'method': request.method,
+                'path': request.path,
+                'view': match.view_name if match else None,
+                'status': response.status_code,
+                'total_ms': round(total, 1),
+                'db_ms': round(metrics.sql_time * 1000, 1),
+                'queries': metrics.queries,
+                'spans_ms': {name: round(seconds * 1000, 1) for name, seconds in metrics.spans.items()},
+                'duplicate_queries': [{'sql': sql, 'count': count} for sql, count in duplicates],
+            }))
+        return response
@@ -17,6 +17,20 @@ urlpatterns = [
     # Custom task-related URLs using function-based views
     path('tasks/', views.taskList, name='task-list'),
     path('tasks/create/', views.taskCreate, name='task-create'),  # Create should be before <str:pk> to avoid conflicts
+    path('tasks/batch/', views.taskBatch, name='task-batch'),
+    path('tasks/mark-complete/', views.mark_tasks_complete, name='mark-tasks-complete'),
+    path('tasks/mark-incomplete/', views.mark_tasks_incomplete, name='mark-tasks-incomplete'),
+    path('tasks/export/', views.taskExport, name='task-export'),
+    path('tasks/import/', views.taskImport, name='task-import'),
+    path('tasks/cache-stats/', views.taskCacheStats, name='task-cache-stats'),
+    path('tasks/stats/', views.taskStats, name='task-stats'),
+    path('tasks/search/', views.taskSearch, name='task-search'),
+    path('tasks/changes/', views.taskChanges, name='task-changes'),
+    path('tasks/archive/', views.taskArchiveList, name='task-archive-list'),
+    path('tasks/archive/<int:pk>/', views.taskArchiveDetail, name='task-archive-detail'),
+    path('users/bulk/', views.userBulkCreate, name='user-bulk-create'),
+    path('users/deletions/<int:pk>/', views.userDeletionDetail, name='user-deletion-detail'),
+    path('metrics/', views.metricsExport, name='metrics'),
     path('tasks/<int:pk>/', views.taskDetail, name='task-detail'),  # Expecting an integer pk
     path('tasks/update/<int:pk>/', views.taskUpdate, name='task-update'),
     path('tasks/delete/<int:pk>/', views.taskDelete, name='task-delete'),
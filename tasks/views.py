@@ -1,11 +1,35 @@
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.response import Response
 from rest_framework import status, viewsets
-from rest_framework.permissions import IsAuthenticated
+from rest_framework.exceptions import NotFound, ParseError
+from rest_framework.permissions import IsAdminUser, IsAuthenticated
+from rest_framework.utils.urls import replace_query_param
+from django.conf import settings
+from django.http import HttpResponse, StreamingHttpResponse
+from django.utils.crypto import constant_time_compare
+from django.views.decorators.http import require_GET
 from django.shortcuts import get_object_or_404
+import secrets
+from copy import copy
+from django.db import transaction
 from django.utils import timezone
-from .models import Task, User
-from .serializers import TaskSerializer, UserSerializer
+from .models import Task, TaskArchive, User, UserDeletion
+from .serializers import (
+    TaskArchiveSerializer, TaskRowSerializer, TaskSerializer, UserDeletionSerializer, UserSerializer, get_task_fields,
+)
+from .pagination import ArchivePagination, KeysetPagination
+from .export import EXPORT_FORMATS
+from .importer import IMPORT_FORMATS, TaskImporter, guess_format
+from .changes import record_task_changes
+from .conditional import TaskValidators
+from .cache import page_cache
+from .authentication import invalidate_cached_user
+from .stats import get_stats
+from .search import search_task_ids
+from . import sync
+from .metrics import render_metrics
+from .provisioning import UserProvisioner
+from .purge import request_user_deletion
 
 from django.contrib.auth.forms import UserCreationForm
 from django.urls import reverse_lazy
@@ -23,6 +47,11 @@ class ProfileUpdateView(LoginRequiredMixin, UpdateView):
     def get_object(self):
         return self.request.user
 
+    def form_valid(self, form):
+        response = super().form_valid(form)
+        invalidate_cached_user(self.object)
+        return response
+
 # User Registration View
 class RegisterView(generic.CreateView):
     form_class = UserCreationForm
@@ -33,28 +62,130 @@ class RegisterView(generic.CreateView):
 class UserViewSet(viewsets.ModelViewSet):
     queryset = User.objects.all()
     serializer_class = UserSerializer
+    ordering = ('id',)  # Keyset pagination order
+
+    def perform_update(self, serializer):
+        user = serializer.save()
+        invalidate_cached_user(user)
+
+    # Deactivate now and leave the data to the purge_users worker
+    def destroy(self, request, *args, **kwargs):
+        deletion = request_user_deletion(self.get_object())
+        return Response(UserDeletionSerializer(deletion).data, status=status.HTTP_202_ACCEPTED)
+
+# Shared task filtering for the ViewSet and the function-based views
+def filter_tasks(queryset, params):
+    status_filter = params.get('status')
+    priority_filter = params.get('priority')
+    due_date_filter = params.get('due_date')
+
+    # Unknown choices match nothing (they have no stored code)
+    if status_filter:
+        if status_filter not in Task.STATUS_CODES:
+            return queryset.none()
+        queryset = queryset.filter(status=status_filter)
+    if priority_filter:
+        if priority_filter not in Task.PRIORITY_CODES:
+            return queryset.none()
+        queryset = queryset.filter(priority=priority_filter)
+    if due_date_filter:
+        queryset = queryset.filter(due_date=due_date_filter)
+
+    return queryset
+
+# Task write helpers shared by the function-based views, the ViewSet and the
+# async API. Each write and its bookkeeping commit together. The before
+# state is read from the row locked in that transaction, not from the
+# instance the view loaded earlier, so concurrent writes to one task apply
+# their counter deltas one after the other.
+@transaction.atomic
+def create_task(serializer, user):
+    task = serializer.save(user=user)
+    record_task_changes(user, after=[task])
+    return task
+
+@transaction.atomic
+def update_task(serializer):
+    locked = Task.objects.select_for_update().filter(pk=serializer.instance.pk).first()
+    if locked is None:
+        raise NotFound()  # Deleted meanwhile; saving would insert it again
+    before = copy(locked)
+    serializer.instance = locked
+    task = serializer.save()
+    record_task_changes(task.user_id, before=[before], after=[task])
+    return task
+
+@transaction.atomic
+def delete_task(task):
+    deleted = Task.objects.select_for_update().filter(pk=task.pk).first()
+    if deleted is None:
+        return  # Someone else deleted it first
+    count, _ = Task.objects.filter(pk=deleted.pk).delete()
+    if count:
+        record_task_changes(deleted.user_id, before=[deleted])
+
+# ?ordering= choices for the TaskViewSet list. Each is the order of an index
+# that starts with user (Task.Meta.indexes), so pages come off the index
+# without a sort; priority sorts by its stored code, Low < Medium < High.
+TASK_ORDERINGS = {
+    'due_date': ('due_date', 'id'),
+    'priority,due_date': ('priority', 'due_date', 'id'),
+    '-priority,due_date': ('-priority', 'due_date', 'id'),
+}
 
 class TaskViewSet(viewsets.ModelViewSet):
     queryset = Task.objects.all()
     serializer_class = TaskSerializer
+    ordering = TASK_ORDERINGS['due_date']  # Keyset pagination order
 
     def get_queryset(self):
         # Filter tasks by logged-in user
         queryset = super().get_queryset().filter(user=self.request.user)
-        
-        # Filtering logic
-        status_filter = self.request.query_params.get('status')
-        priority_filter = self.request.query_params.get('priority')
-        due_date_filter = self.request.query_params.get('due_date')
+        return filter_tasks(queryset, self.request.query_params)
+
+    # Lists are read-only, so serialize straight from values() rows
+    def list(self, request, *args, **kwargs):
+        fields = get_task_fields(request.query_params)
+        ordering = request.query_params.get('ordering', 'due_date')
+        if ordering not in TASK_ORDERINGS:
+            raise ParseError(f"Unsupported ordering; use one of: {', '.join(TASK_ORDERINGS)}")
+        self.ordering = TASK_ORDERINGS[ordering]
+        validators = TaskValidators(request)
+        not_modified = validators.not_modified()
+        if not_modified is not None:
+            return not_modified
 
-        if status_filter:
-            queryset = queryset.filter(status=status_filter)
-        if priority_filter:
-            queryset = queryset.filter(priority=priority_filter)
-        if due_date_filter:
-            queryset = queryset.filter(due_date=due_date_filter)
+        data = page_cache.get(request, validators)
+        if data is None:
+            rows = TaskRowSerializer(fields)
+            queryset = self.filter_queryset(self.get_queryset())
+            page = self.paginate_queryset(rows.values(queryset, extra=self.ordering))
+            data = self.get_paginated_response(rows.serialize(page)).data
+            page_cache.set(request, validators, data)
+        return validators.apply(Response(data))
 
-        return queryset
+    def retrieve(self, request, *args, **kwargs):
+        fields = get_task_fields(request.query_params)
+        validators = TaskValidators(request)
+        not_modified = validators.not_modified()
+        if not_modified is not None:
+            return not_modified
+        if fields is None:
+            return validators.apply(super().retrieve(request, *args, **kwargs))
+
+        # Only the requested columns are loaded
+        self.queryset = self.queryset.only(*fields)
+        serializer = self.get_serializer(self.get_object(), fields=fields)
+        return validators.apply(Response(serializer.data))
+
+    def perform_create(self, serializer):
+        create_task(serializer, self.request.user)
+
+    def perform_update(self, serializer):
+        update_task(serializer)
+
+    def perform_destroy(self, instance):
+        delete_task(instance)
 
 # Task Overview
 @api_view(['GET'])
@@ -67,6 +198,17 @@ def taskOverview(request):
         'Delete': '/api/tasks/delete/<str:pk>/',
         'Mark Complete': '/api/tasks/<str:pk>/mark-complete/',
         'Mark Incomplete': '/api/tasks/<str:pk>/mark-incomplete/',
+        'Mark All Complete': '/api/tasks/mark-complete/?priority=&due_date=',
+        'Mark All Incomplete': '/api/tasks/mark-incomplete/?priority=&due_date=',
+        'Batch': '/api/tasks/batch/',
+        'Export': '/api/tasks/export/?fmt=ndjson|csv',
+        'Import': '/api/tasks/import/',
+        'Stats': '/api/tasks/stats/',
+        'Search': '/api/tasks/search/?q=',
+        'Changes': '/api/tasks/changes/?since=<cursor>',
+        'Change Events (SSE, ASGI)': '/api/async/tasks/events/',
+        'Archive': '/api/tasks/archive/',
+        'Archived Detail': '/api/tasks/archive/<str:pk>/',
     }
     return Response(tasks_urls)
 
@@ -74,23 +216,157 @@ def taskOverview(request):
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
 def taskList(request):
-    tasks = Task.objects.filter(user=request.user)
-    serializer = TaskSerializer(tasks, many=True)
-    return Response(serializer.data)
+    fields = get_task_fields(request.query_params)
+    validators = TaskValidators(request)
+    not_modified = validators.not_modified()
+    if not_modified is not None:
+        return not_modified
+
+    data = page_cache.get(request, validators)
+    if data is None:
+        tasks = filter_tasks(Task.objects.filter(user=request.user), request.query_params)
+        rows = TaskRowSerializer(fields)
+        paginator = KeysetPagination()
+        page = paginator.paginate_queryset(rows.values(tasks, extra=TaskViewSet.ordering), request, view=TaskViewSet)
+        data = paginator.get_paginated_response(rows.serialize(page)).data
+        page_cache.set(request, validators, data)
+    return validators.apply(Response(data))
+
+# Hit/miss/eviction counters of this process's task page cache
+@api_view(['GET'])
+@permission_classes([IsAdminUser])
+def taskCacheStats(request):
+    return Response(page_cache.get_stats())
+
+# Task counts by status and priority plus overdue / due-this-week totals,
+# read from the maintained counters instead of the Task table
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def taskStats(request):
+    return Response(get_stats(request.user))
+
+# Ranked full-text search over the user's task titles and descriptions.
+# Ranked results cannot be keyset-paged, so this pages with a bounded offset.
+SEARCH_MAX_OFFSET = 1000
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def taskSearch(request):
+    text = request.query_params.get('q', '').strip()
+    if not text:
+        return Response({'error': "Provide a search query with ?q=."}, status=status.HTTP_400_BAD_REQUEST)
+
+    paginator = KeysetPagination()
+    limit = paginator.get_page_size(request)
+    try:
+        offset = min(max(int(request.query_params.get('offset', 0)), 0), SEARCH_MAX_OFFSET)
+    except ValueError:
+        offset = 0
+
+    # One extra id tells whether there is a next page
+    ids = search_task_ids(request.user, text, limit + 1, offset)
+    has_next = len(ids) > limit
+    ids = ids[:limit]
+
+    rows = TaskRowSerializer()
+    by_id = {row['id']: row for row in rows.values(Task.objects.filter(id__in=ids))}
+    results = rows.serialize(by_id[pk] for pk in ids if pk in by_id)
+
+    url = request.build_absolute_uri()
+    next_offset = offset + limit
+    return Response({
+        'next': replace_query_param(url, 'offset', next_offset) if has_next and next_offset <= SEARCH_MAX_OFFSET else None,
+        'previous': replace_query_param(url, 'offset', max(offset - limit, 0)) if offset else None,
+        'results': results,
+    })
+
+# Delta sync: tasks created, updated or deleted after ?since=<cursor>, in
+# batches of ?limit=. Keep the returned cursor and call again while
+# has_more is true. Accepts ?fields=/?exclude= like the task list.
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def taskChanges(request):
+    rows = TaskRowSerializer(get_task_fields(request.query_params))
+    try:
+        limit = max(1, min(int(request.query_params.get('limit', sync.DEFAULT_BATCH_SIZE)), sync.MAX_BATCH_SIZE))
+    except ValueError:
+        limit = sync.DEFAULT_BATCH_SIZE
+    try:
+        data = sync.get_changes(request.user, request.query_params.get('since'), limit, rows)
+    except sync.CursorExpired:
+        return Response({'error': "This sync cursor has expired. Sync again without ?since=."}, status=status.HTTP_410_GONE)
+    return Response(data)
+
+# Stream every task of the user as NDJSON (default) or CSV. Accepts the same
+# filters as the list endpoints. The format is chosen with ?fmt= because
+# DRF reserves ?format= for content negotiation.
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def taskExport(request):
+    fmt = request.query_params.get('fmt', 'ndjson')
+    if fmt not in EXPORT_FORMATS:
+        return Response({'error': f"Unsupported export format '{fmt}'."}, status=status.HTTP_400_BAD_REQUEST)
+
+    stream, content_type = EXPORT_FORMATS[fmt]
+    tasks = filter_tasks(Task.objects.filter(user=request.user), request.query_params).order_by('id')
+    response = StreamingHttpResponse(stream(tasks), content_type=content_type)
+    response['Content-Disposition'] = f'attachment; filename="tasks.{fmt}"'
+    return response
+
+# Import tasks from an uploaded CSV or NDJSON file (multipart field "file").
+# Rows are validated like taskCreate and inserted in fixed-size batches;
+# the response reports per-row errors and throughput.
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+def taskImport(request):
+    upload = request.FILES.get('file')
+    if upload is None:
+        return Response({'error': 'Upload a CSV or NDJSON file in the "file" field.'}, status=status.HTTP_400_BAD_REQUEST)
+
+    fmt = request.query_params.get('fmt') or guess_format(upload.name)
+    if fmt not in IMPORT_FORMATS:
+        return Response({'error': f"Unsupported import format '{fmt}'."}, status=status.HTTP_400_BAD_REQUEST)
+
+    result = TaskImporter(request.user).run(upload.file, fmt)
+    return Response(result, status=status.HTTP_200_OK)
+
+# Archived (completed, older) tasks, newest completion first; filters as taskList
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def taskArchiveList(request):
+    tasks = filter_tasks(TaskArchive.objects.filter(user=request.user), request.query_params)
+    paginator = ArchivePagination()
+    page = paginator.paginate_queryset(tasks, request)
+    return paginator.get_paginated_response(TaskArchiveSerializer(page, many=True).data)
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def taskArchiveDetail(request, pk):
+    task = get_object_or_404(TaskArchive, id=pk, user=request.user)
+    return Response(TaskArchiveSerializer(task).data)
 
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
 def taskDetail(request, pk):
-    task = get_object_or_404(Task, id=pk, user=request.user)
-    serializer = TaskSerializer(task)
-    return Response(serializer.data)
+    fields = get_task_fields(request.query_params)
+    validators = TaskValidators(request)
+    not_modified = validators.not_modified()
+    if not_modified is not None:
+        return not_modified
+
+    tasks = Task.objects.filter(user=request.user)
+    if fields is not None:
+        tasks = tasks.only(*fields)
+    task = get_object_or_404(tasks, id=pk)
+    serializer = TaskSerializer(task, fields=fields)
+    return validators.apply(Response(serializer.data))
 
 @api_view(['POST'])
 @permission_classes([IsAuthenticated])
 def taskCreate(request):
     serializer = TaskSerializer(data=request.data)
     if serializer.is_valid():
-        serializer.save(user=request.user)
+        create_task(serializer, request.user)
         return Response(serializer.data, status=status.HTTP_201_CREATED)
     return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
@@ -100,7 +376,7 @@ def taskUpdate(request, pk):
     task = get_object_or_404(Task, id=pk, user=request.user)
     serializer = TaskSerializer(instance=task, data=request.data)
     if serializer.is_valid():
-        serializer.save()
+        update_task(serializer)
         return Response(serializer.data)
     return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
@@ -108,35 +384,218 @@ def taskUpdate(request, pk):
 @permission_classes([IsAuthenticated])
 def taskDelete(request, pk):
     task = get_object_or_404(Task, id=pk, user=request.user)
-    task.delete()
+    delete_task(task)
     return Response({'detail': 'Task deleted successfully'}, status=status.HTTP_204_NO_CONTENT)
 
+# Batch create/update/delete in one request and one transaction.
+# Body: {"create": [{...}], "update": [{"id": 1, ...}], "delete": [2, 3]}
+# A task id may appear once across "update" and "delete". Every item is
+# validated first; if any item fails nothing is written and the per-item
+# results carry the errors. Otherwise the writes run as one
+# bulk_create, one bulk_update and one DELETE ... WHERE id IN (...).
+MAX_BATCH_SIZE = 500
+
+def _batch_item(data):
+    # The owner always comes from the request; drop it so validation does
+    # not look the user up once per item
+    data = dict(data)
+    data.pop('user', None)
+    return data
+
+# Report only the failures; valid items were not applied
+def _batch_failed(results):
+    for key in results:
+        results[key] = [result or {'status': status.HTTP_424_FAILED_DEPENDENCY} for result in results[key]]
+    return Response(results, status=status.HTTP_400_BAD_REQUEST)
+
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+def taskBatch(request):
+    if not isinstance(request.data, dict):
+        return Response({'error': 'Expected a JSON object.'}, status=status.HTTP_400_BAD_REQUEST)
+    creates = request.data.get('create', [])
+    updates = request.data.get('update', [])
+    deletes = request.data.get('delete', [])
+
+    if not all(isinstance(items, list) for items in (creates, updates, deletes)):
+        return Response({'error': "'create', 'update' and 'delete' must be lists."}, status=status.HTTP_400_BAD_REQUEST)
+    if len(creates) + len(updates) + len(deletes) > MAX_BATCH_SIZE:
+        return Response({'error': f'A batch may contain at most {MAX_BATCH_SIZE} operations.'}, status=status.HTTP_400_BAD_REQUEST)
+
+    update_ids = [item.get('id') if isinstance(item, dict) else None for item in updates]
+    ids = update_ids + deletes
+    if not all(isinstance(pk, int) and not isinstance(pk, bool) for pk in ids):
+        return Response({'error': 'Every update needs an integer "id" and every delete must be a task id.'},
+                        status=status.HTTP_400_BAD_REQUEST)
+    wanted = set(ids)
+    if len(wanted) < len(ids):
+        return Response({'error': 'A task id may appear only once across update and delete.'}, status=status.HTTP_400_BAD_REQUEST)
+    existing = Task.objects.filter(user=request.user).in_bulk(wanted)
+
+    results = {'create': [], 'update': [], 'delete': []}
+    new_tasks, changes, changed_fields, delete_ids = [], [], set(), []
+    valid = True
+
+    for item in creates:
+        if not isinstance(item, dict):
+            results['create'].append({'status': status.HTTP_400_BAD_REQUEST, 'errors': {'non_field_errors': ['Expected an object.']}})
+            valid = False
+            continue
+        serializer = TaskSerializer(data=_batch_item(item))
+        if serializer.is_valid():
+            new_tasks.append(Task(**serializer.validated_data, user=request.user))
+            results['create'].append(None)
+        else:
+            results['create'].append({'status': status.HTTP_400_BAD_REQUEST, 'errors': serializer.errors})
+            valid = False
+
+    for pk, item in zip(update_ids, updates):
+        task = existing.get(pk)
+        if task is None:
+            results['update'].append({'id': pk, 'status': status.HTTP_404_NOT_FOUND, 'errors': {'detail': 'Not found.'}})
+            valid = False
+            continue
+        serializer = TaskSerializer(instance=task, data=_batch_item(item), partial=True)
+        if serializer.is_valid():
+            changes.append((pk, serializer.validated_data))
+            changed_fields.update(serializer.validated_data)
+            results['update'].append(None)
+        else:
+            results['update'].append({'id': pk, 'status': status.HTTP_400_BAD_REQUEST, 'errors': serializer.errors})
+            valid = False
+
+    for pk in deletes:
+        if pk in existing:
+            delete_ids.append(pk)
+            results['delete'].append(None)
+        else:
+            results['delete'].append({'id': pk, 'status': status.HTTP_404_NOT_FOUND, 'errors': {'detail': 'Not found.'}})
+            valid = False
+
+    if not valid:
+        return _batch_failed(results)
+
+    with transaction.atomic():
+        # Apply the changes to the rows as locked here, and take the before
+        # states from them (see update_task)
+        locked = Task.objects.select_for_update().filter(user=request.user).in_bulk(list(existing))
+        if len(locked) < len(existing):
+            # Deleted since the batch was validated
+            for key, pks in (('update', update_ids), ('delete', deletes)):
+                results[key] = [
+                    {'id': pk, 'status': status.HTTP_404_NOT_FOUND, 'errors': {'detail': 'Not found.'}}
+                    if pk not in locked else result
+                    for pk, result in zip(pks, results[key])
+                ]
+            return _batch_failed(results)
+        before = {pk: copy(task) for pk, task in locked.items()}
+
+        changed_tasks = []
+        for pk, data in changes:
+            task = locked[pk]
+            for attr, value in data.items():
+                setattr(task, attr, value)
+            changed_tasks.append(task)
+
+        Task.objects.bulk_create(new_tasks)
+        if changed_tasks and changed_fields:
+            Task.objects.bulk_update(changed_tasks, list(changed_fields))
+        if delete_ids:
+            Task.objects.filter(user=request.user, id__in=delete_ids).delete()
+        replaced = [before[pk] for pk, _ in changes]
+        deleted = [before[pk] for pk in delete_ids]
+        record_task_changes(request.user, before=replaced + deleted, after=new_tasks + changed_tasks)
+
+    results['create'] = [{'status': status.HTTP_201_CREATED, 'data': data} for data in TaskSerializer(new_tasks, many=True).data]
+    results['update'] = [{'id': task.id, 'status': status.HTTP_200_OK, 'data': data}
+                         for task, data in zip(changed_tasks, TaskSerializer(changed_tasks, many=True).data)]
+    results['delete'] = [{'id': pk, 'status': status.HTTP_204_NO_CONTENT} for pk in delete_ids]
+    return Response(results, status=status.HTTP_200_OK)
+
 # Task Completion Handlers
-def set_task_status(task, status):
-    task.status = status
-    task.completed_at = timezone.now() if status == 'Completed' else None
-    task.save()
-    return TaskSerializer(task).data
+# Move the tasks of `queryset` (one user's) that are not in `status` yet to
+# it with a single conditional UPDATE, so a concurrent transition cannot
+# slip in between a check and the write. The rows it changed are tagged
+# with a one-off negative change_seq, read back through the
+# (user, change_seq) index for the bookkeeping, and then given their real
+# change_seq. Returns the changed tasks, loading only `fields` (all if None).
+TRANSITION_FIELDS = ('id', 'user', 'status', 'priority', 'due_date', 'completed_at')
+
+@transaction.atomic
+def transition_tasks(user, queryset, new_status, fields=TRANSITION_FIELDS):
+    marker = -secrets.randbits(62) - 1
+    completed_at = timezone.now() if new_status == Task.STATUS_COMPLETED else None
+    if not queryset.exclude(status=new_status).update(status=new_status, completed_at=completed_at, change_seq=marker):
+        return []
+
+    changed = Task.objects.filter(user=user, change_seq=marker)
+    tasks = list(changed.only(*fields) if fields else changed)
+    before = []
+    for task in tasks:
+        old = copy(task)
+        old.status = Task.STATUS_PENDING if new_status == Task.STATUS_COMPLETED else Task.STATUS_COMPLETED
+        before.append(old)
+    record_task_changes(user, before=before, after=tasks, rows=changed)
+    return tasks
+
+# Transition one task; returns (response data, HTTP status)
+def set_task_status(user, pk, new_status, message):
+    tasks = transition_tasks(user, Task.objects.filter(id=pk, user=user), new_status, fields=None)
+    if tasks:
+        return TaskSerializer(tasks[0]).data, status.HTTP_200_OK
+    if not Task.objects.filter(id=pk, user=user).exists():
+        return {'detail': 'Not found.'}, status.HTTP_404_NOT_FOUND
+    return {'error': message}, status.HTTP_409_CONFLICT
 
 @api_view(['POST'])
 @permission_classes([IsAuthenticated])
 def mark_task_complete(request, pk):
-    task = get_object_or_404(Task, id=pk, user=request.user)
-    if task.status == 'Completed':
-        return Response({'error': 'Task is already marked as complete.'}, status=status.HTTP_400_BAD_REQUEST)
-    
-    data = set_task_status(task, 'Completed')
-    return Response(data, status=status.HTTP_200_OK)
+    data, code = set_task_status(request.user, pk, Task.STATUS_COMPLETED, 'Task is already marked as complete.')
+    return Response(data, status=code)
 
 @api_view(['POST'])
 @permission_classes([IsAuthenticated])
 def mark_task_incomplete(request, pk):
-    task = get_object_or_404(Task, id=pk, user=request.user)
-    if task.status == 'Pending':
-        return Response({'error': 'Task is already marked as incomplete.'}, status=status.HTTP_400_BAD_REQUEST)
-    
-    data = set_task_status(task, 'Pending')
-    return Response(data, status=status.HTTP_200_OK)
+    data, code = set_task_status(request.user, pk, Task.STATUS_PENDING, 'Task is already marked as incomplete.')
+    return Response(data, status=code)
+
+# Complete or reopen every task matching the list filters (?status=,
+# ?priority=, ?due_date=) and, if given, the "ids" list in the body, in one
+# statement. Tasks already in the target status are left alone.
+def set_tasks_status(request, new_status):
+    # An empty body parses to an empty dict; anything else but an object
+    # must not fall through to "every task that matches the filters"
+    if not isinstance(request.data, dict):
+        return Response({'error': 'Expected a JSON object.'}, status=status.HTTP_400_BAD_REQUEST)
+    tasks = filter_tasks(Task.objects.filter(user=request.user), request.query_params)
+    ids = request.data.get('ids')
+    if ids is not None:
+        if not isinstance(ids, list) or not all(isinstance(pk, int) and not isinstance(pk, bool) for pk in ids):
+            return Response({'error': 'ids must be a list of task ids.'}, status=status.HTTP_400_BAD_REQUEST)
+        tasks = tasks.filter(id__in=ids)
+    changed = transition_tasks(request.user, tasks, new_status, fields=('id', 'user', 'status', 'priority', 'due_date'))
+    return Response({'updated': len(changed), 'ids': sorted(task.id for task in changed)}, status=status.HTTP_200_OK)
+
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+def mark_tasks_complete(request):
+    return set_tasks_status(request, Task.STATUS_COMPLETED)
+
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+def mark_tasks_incomplete(request):
+    return set_tasks_status(request, Task.STATUS_PENDING)
+
+# Request metrics of all workers in the Prometheus text format. A plain
+# Django view, so a scraper's bearer token is not taken for a JWT.
+@require_GET
+def metricsExport(request):
+    token = settings.METRICS_TOKEN
+    header = request.headers.get('Authorization', '')
+    scraper = bool(token) and constant_time_compare(header, f'Bearer {token}')
+    if not scraper and not request.user.is_staff:
+        return HttpResponse('Forbidden', status=status.HTTP_403_FORBIDDEN, content_type='text/plain')
+    return HttpResponse(render_metrics(), content_type='text/plain; version=0.0.4; charset=utf-8')
 
 # User Management Views
 @api_view(['POST'])
@@ -147,6 +606,27 @@ def userCreate(request):
         return Response(serializer.data, status=status.HTTP_201_CREATED)
     return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
+MAX_PROVISION_SIZE = 1000
+
+# Create many users at once: {"users": [{"username", "email", "password", "bio"}, ...]}.
+# Passwords are hashed in parallel and conflicts are reported per row
+# (rows are numbered from 1).
+@api_view(['POST'])
+@permission_classes([IsAdminUser])
+def userBulkCreate(request):
+    users = request.data.get('users') if isinstance(request.data, dict) else None
+    if not isinstance(users, list):
+        return Response({'error': "'users' must be a list."}, status=status.HTTP_400_BAD_REQUEST)
+    if len(users) > MAX_PROVISION_SIZE:
+        return Response({'error': f'At most {MAX_PROVISION_SIZE} users per request.'}, status=status.HTTP_400_BAD_REQUEST)
+
+    rows = (
+        (num, row, None) if isinstance(row, dict) else (num, None, {'non_field_errors': ['Expected an object.']})
+        for num, row in enumerate(users, start=1)
+    )
+    result = UserProvisioner(batch_size=MAX_PROVISION_SIZE).run(rows)
+    return Response(result, status=status.HTTP_201_CREATED if result['created'] else status.HTTP_400_BAD_REQUEST)
+
 @api_view(['PUT'])
 @permission_classes([IsAuthenticated])
 def userUpdate(request, pk):
@@ -157,6 +637,7 @@ def userUpdate(request, pk):
     serializer = UserSerializer(instance=user, data=request.data)
     if serializer.is_valid():
         serializer.save()
+        invalidate_cached_user(user)
         return Response(serializer.data)
     return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
@@ -167,5 +648,12 @@ def userDelete(request, pk):
     if request.user != user:
         return Response({'error': 'You are not allowed to delete this user.'}, status=status.HTTP_403_FORBIDDEN)
     
-    user.delete()
-    return Response({'detail': 'User deleted successfully'}, status=status.HTTP_204_NO_CONTENT)
+    deletion = request_user_deletion(user)
+    return Response(UserDeletionSerializer(deletion).data, status=status.HTTP_202_ACCEPTED)
+
+# Progress of an account deletion; the user can no longer log in to ask
+@api_view(['GET'])
+@permission_classes([IsAdminUser])
+def userDeletionDetail(request, pk):
+    deletion = get_object_or_404(UserDeletion, user_id=pk)
+    return Response(UserDeletionSerializer(deletion).data)